@@ -13,6 +13,8 @@ class Settings(BaseSettings):
     # ChromaDB Configuration
     chroma_persist_directory: str = "./data/embeddings"
     chroma_collection_name: str = "n8n_knowledge"
+    # Per-process LRU of query embeddings and retrieval results
+    rag_cache_size: int = 512
     
     # API Configuration
     api_host: str = "0.0.0.0"
@@ -23,6 +25,22 @@ class Settings(BaseSettings):
     max_tokens: int = 4000
     temperature: float = 0.3
     top_k_retrieval: int = 7
+    # Constrain LLM output with a JSON schema (requires a model that supports
+    # response_format json_schema, e.g. gpt-4o-2024-08-06 or later)
+    structured_outputs: bool = False
+    # Start the fallback generator alongside the enhanced RAG generator so a
+    # failure does not add both latencies. When the request has no trigger the
+    # fallback is an LLM completion, which starts on every request and is only
+    # aborted (and still partly billed) once the enhanced generator succeeds
+    speculative_fallback: bool = False
+    
+    # Response Cache Configuration
+    # Stateless requests only; each cache miss spends one extra OpenAI embedding
+    # call to key the semantic tier
+    response_cache_enabled: bool = True
+    response_cache_size: int = 256
+    response_cache_ttl_seconds: float = 3600.0
+    response_cache_similarity_threshold: float = 0.95
     
     class Config:
         env_file = ".env"
@@ -3,7 +3,10 @@ Main FastAPI application for n8n workflow generator.
 Enhanced with conversation-based workflow generation.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from .config import get_settings
 from .routers import generate, validate, conversation
@@ -11,11 +14,18 @@ from .routers import generate, validate, conversation
 # Get settings
 settings = get_settings()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the ChromaDB index before the first request needs it."""
+    await run_in_threadpool(conversation.rag_service.warmup)
+    yield
+
 # Create FastAPI app
 app = FastAPI(
     title="n8n Flow Generator API",
     description="Generate production-ready n8n workflows from natural language using AI with interactive questioning",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
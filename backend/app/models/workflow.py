@@ -39,3 +39,7 @@ class ValidationResult(BaseModel):
     errors: List[ValidationError] = []
     warnings: List[str] = []
 
+class WorkflowGenerationResponse(BaseModel):
+    """Shape of the LLM response used for structured-output generation."""
+    workflowJSON: WorkflowJSON
+    explanation: str
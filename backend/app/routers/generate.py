@@ -2,7 +2,9 @@
 API routes for workflow generation.
 """
 
+import json
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from ..models.requests import GenerateRequest, GenerateResponse
 from ..models.workflow import ValidationResult
 from ..services.llm_service import LLMService
@@ -51,3 +53,41 @@ async def generate_workflow(request: GenerateRequest) -> GenerateResponse:
             detail=f"Error generating workflow: {str(e)}"
         )
 
+
+@router.post("/generate/stream")
+async def generate_workflow_stream(request: GenerateRequest) -> StreamingResponse:
+    """
+    Generate an n8n workflow, streaming LLM output as server-sent events.
+    
+    Emits ``delta`` events while tokens arrive, then a final ``result`` event
+    with the workflow JSON, explanation and validation (or an ``error`` event).
+    
+    Args:
+        request: GenerateRequest containing user message and optional context
+    
+    Returns:
+        StreamingResponse with ``text/event-stream`` media type
+    """
+    def event_stream():
+        try:
+            for event in llm_service.generate_workflow_stream(
+                user_request=request.message,
+                previous_workflow=request.previousWorkflow
+            ):
+                if event["type"] == "result":
+                    result = event["result"]
+                    from ..models.workflow import WorkflowJSON
+                    workflow = WorkflowJSON(**result['workflowJSON'])
+                    validation = validation_service.validate_workflow(workflow)
+                    event = {
+                        "type": "result",
+                        "workflowJSON": workflow.model_dump(),
+                        "explanation": result.get('explanation', 'Workflow generated successfully.'),
+                        "validation": validation.model_dump()
+                    }
+                yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            error = {"type": "error", "detail": f"Error generating workflow: {str(e)}"}
+            yield f"data: {json.dumps(error)}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
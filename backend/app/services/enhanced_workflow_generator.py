@@ -7,8 +7,8 @@ Based on flowfix.txt requirements for production-ready workflows.
 import json
 import uuid
 from typing import Dict, List, Any, Optional, Tuple
-from openai import OpenAI
 
+from .openai_client import get_openai_client
 from .node_schemas import get_node_schema_validator
 from .quality_validator import get_quality_validator
 from .expert_templates import get_expert_template_manager
@@ -32,7 +32,7 @@ class EnhancedWorkflowGenerator:
     
     def __init__(self):
         self.settings = get_settings()
-        self.llm_client = OpenAI(api_key=self.settings.openai_api_key)
+        self.llm_client = get_openai_client()
         self.node_validator = get_node_schema_validator()
         self.quality_validator = get_quality_validator()
         self.expert_manager = get_expert_template_manager()
@@ -3,10 +3,18 @@ Expert template management and integration.
 Manages high-quality reference workflows for RAG retrieval.
 """
 
+import heapq
 import json
 import os
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 class ExpertTemplateManager:
@@ -23,6 +31,9 @@ class ExpertTemplateManager:
         self.templates: List[Dict[str, Any]] = []
         self.metadata: Dict[str, Dict[str, Any]] = {}
         
+        # Per-instance LRU cache for similarity lookups (corpus is immutable post-load)
+        self._find_similar_cached = lru_cache(maxsize=256)(self._score_templates)
+        
         # Load templates if directory exists
         if self.template_dir.exists():
             self._load_all_templates()
@@ -31,6 +42,7 @@ class ExpertTemplateManager:
     def _load_all_templates(self):
         """Load all expert workflow templates from disk."""
         self.templates = []
+        self._find_similar_cached.cache_clear()
         
         for category_dir in ['social_media', 'ai_video_generation']:
             category_path = self.template_dir / category_dir
@@ -43,14 +55,22 @@ class ExpertTemplateManager:
                     with open(file_path, 'r', encoding='utf-8') as f:
                         template = json.load(f)
                     
-                    self.templates.append({
+                    # Normalize node types so hot loops can index n['type'] directly
+                    for node in template.get('nodes', []):
+                        if not node.get('type'):
+                            node['type'] = ''
+                    
+                    entry = {
                         'name': file_path.stem,
                         'category': category_dir,
                         'filepath': str(file_path),
                         'workflow': template,
                         'node_count': len(template.get('nodes', [])),
                         'complexity': self._calculate_complexity(template)
-                    })
+                    }
+                    # Templates are immutable once loaded, so patterns are computed once
+                    entry['_patterns'] = self.extract_patterns(entry)
+                    self.templates.append(entry)
                 except Exception as e:
                     print(f"Error loading template {file_path}: {e}")
     
@@ -62,6 +82,7 @@ class ExpertTemplateManager:
             try:
                 with open(metadata_file, 'r', encoding='utf-8') as f:
                     self.metadata = json.load(f)
+                self._find_similar_cached.cache_clear()
             except Exception as e:
                 print(f"Error loading metadata: {e}")
     
@@ -71,11 +92,11 @@ class ExpertTemplateManager:
         node_count = len(nodes)
         
         # Check for advanced features
-        has_ai = any('ai' in n.get('type', '').lower() or 'langchain' in n.get('type', '').lower() 
-                     for n in nodes)
-        has_conditionals = any(n.get('type') in ['n8n-nodes-base.if', 'n8n-nodes-base.switch'] 
-                               for n in nodes)
-        has_merge = any(n.get('type') == 'n8n-nodes-base.merge' for n in nodes)
+        node_types = [n['type'] for n in nodes]
+        has_ai = any('ai' in t.lower() or 'langchain' in t.lower() for t in node_types)
+        has_conditionals = any(t in ['n8n-nodes-base.if', 'n8n-nodes-base.switch'] 
+                               for t in node_types)
+        has_merge = any(t == 'n8n-nodes-base.merge' for t in node_types)
         has_error_handling = any('onError' in n or 'retryOnFail' in n for n in nodes)
         
         complexity_score = 0
@@ -108,7 +129,8 @@ class ExpertTemplateManager:
         self, 
         use_case: str, 
         integrations: List[str], 
-        top_k: int = 3
+        top_k: int = 3,
+        include_workflow: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Find most similar expert templates based on use case and integrations.
@@ -117,6 +139,9 @@ class ExpertTemplateManager:
             use_case: General use case (e.g., 'social_media', 'ai_video')
             integrations: List of required integrations
             top_k: Number of results to return
+            include_workflow: Include the full workflow JSON in each result.
+                When False only name, category, node_count, complexity,
+                relevance_score and _patterns are returned.
         
         Returns:
             List of matching templates with metadata
@@ -124,9 +149,22 @@ class ExpertTemplateManager:
         if not self.templates:
             return []
         
-        scored_templates = []
+        integrations_key = tuple(sorted(integrations))
+        cached = self._find_similar_cached(use_case, integrations_key, top_k, include_workflow)
+        # Fresh result dicts so callers can add or replace keys without touching the cache
+        return [dict(result) for result in cached]
+    
+    def _score_templates(
+        self,
+        use_case: str,
+        integrations: Tuple[str, ...],
+        top_k: int,
+        include_workflow: bool
+    ) -> Tuple[Dict[str, Any], ...]:
+        """Score all templates against a query; wrapped by the per-instance LRU cache."""
+        scored = []
         
-        for template in self.templates:
+        for idx, template in enumerate(self.templates):
             score = 0
             
             # Category match
@@ -135,7 +173,7 @@ class ExpertTemplateManager:
             
             # Node type matches
             workflow = template['workflow']
-            node_types = {n.get('type', '') for n in workflow.get('nodes', [])}
+            node_types = {n['type'] for n in workflow.get('nodes', [])}
             
             for integration in integrations:
                 integration_lower = integration.lower()
@@ -153,14 +191,27 @@ class ExpertTemplateManager:
                     if any(integration.lower() in tag.lower() for tag in tags):
                         score += 10
             
-            scored_templates.append({
-                **template,
-                'relevance_score': score
-            })
+            scored.append((score, idx))
         
-        # Sort by score and return top_k
-        scored_templates.sort(key=lambda x: x['relevance_score'], reverse=True)
-        return scored_templates[:top_k]
+        # Select top_k by score (ties keep load order); only survivors are copied
+        best = heapq.nlargest(top_k, scored, key=itemgetter(0))
+        if include_workflow:
+            return tuple(
+                {**self.templates[idx], 'relevance_score': score}
+                for score, idx in best
+            )
+        
+        return tuple(
+            {
+                'name': self.templates[idx]['name'],
+                'category': self.templates[idx]['category'],
+                'node_count': self.templates[idx]['node_count'],
+                'complexity': self.templates[idx]['complexity'],
+                'relevance_score': score,
+                '_patterns': self.templates[idx]['_patterns']
+            }
+            for score, idx in best
+        )
     
     def get_all_templates(self) -> List[Dict[str, Any]]:
         """Get all loaded templates."""
@@ -175,32 +226,37 @@ class ExpertTemplateManager:
     
     def extract_patterns(self, template: Dict[str, Any]) -> List[str]:
         """Extract key workflow patterns from a template."""
+        if '_patterns' in template:
+            return template['_patterns']
+        
         patterns = []
         workflow = template.get('workflow', {})
         nodes = workflow.get('nodes', [])
+        # Resolve each node's type once; later passes reuse the pair
+        typed_nodes = [(n, n.get('type') or '') for n in nodes]
         
         # Identify multi-platform posting pattern
-        posting_nodes = [n for n in nodes if 'post' in n.get('type', '').lower() 
-                         or 'blotato' in n.get('type', '').lower()]
+        posting_nodes = [n for n, t in typed_nodes if 'post' in t.lower() 
+                         or 'blotato' in t.lower()]
         if len(posting_nodes) >= 3:
             platforms = [n.get('name', 'platform') for n in posting_nodes[:5]]
             patterns.append(f"Multi-platform distribution: {', '.join(platforms)}")
         
         # Identify AI generation pattern
-        ai_nodes = [n for n in nodes if 'ai' in n.get('type', '').lower() 
-                    or 'openai' in n.get('type', '').lower()
-                    or 'langchain' in n.get('type', '').lower()]
+        ai_nodes = [n for n, t in typed_nodes if 'ai' in t.lower() 
+                    or 'openai' in t.lower()
+                    or 'langchain' in t.lower()]
         if len(ai_nodes) >= 2:
             patterns.append(f"AI-driven content generation with {len(ai_nodes)} AI nodes")
         
         # Identify conditional branching
-        if_nodes = [n for n in nodes if n.get('type') == 'n8n-nodes-base.if']
-        switch_nodes = [n for n in nodes if n.get('type') == 'n8n-nodes-base.switch']
+        if_nodes = [n for n, t in typed_nodes if t == 'n8n-nodes-base.if']
+        switch_nodes = [n for n, t in typed_nodes if t == 'n8n-nodes-base.switch']
         if if_nodes or switch_nodes:
             patterns.append(f"Conditional branching with {len(if_nodes + switch_nodes)} decision points")
         
         # Identify merge pattern
-        merge_nodes = [n for n in nodes if n.get('type') == 'n8n-nodes-base.merge']
+        merge_nodes = [n for n, t in typed_nodes if t == 'n8n-nodes-base.merge']
         if merge_nodes:
             patterns.append(f"Parallel execution with {len(merge_nodes)} merge points")
         
@@ -211,8 +267,8 @@ class ExpertTemplateManager:
             patterns.append(f"Error handling on {percentage:.0f}% of nodes")
         
         # Identify data transformation
-        set_nodes = [n for n in nodes if n.get('type') == 'n8n-nodes-base.set']
-        code_nodes = [n for n in nodes if n.get('type') in ['n8n-nodes-base.code', 'n8n-nodes-base.function']]
+        set_nodes = [n for n, t in typed_nodes if t == 'n8n-nodes-base.set']
+        code_nodes = [n for n, t in typed_nodes if t in ['n8n-nodes-base.code', 'n8n-nodes-base.function']]
         if set_nodes or code_nodes:
             patterns.append(f"Data transformation with {len(set_nodes + code_nodes)} processing nodes")
         
@@ -229,7 +285,7 @@ class ExpertTemplateManager:
         
         configs = []
         for node in nodes:
-            node_type = node.get('type', '')
+            node_type = node.get('type') or ''
             
             # Filter by type if specified
             if node_type_filter and node_type_filter.lower() not in node_type.lower():
@@ -265,8 +321,15 @@ class ExpertTemplateManager:
         
         metadata_file = metadata_dir / 'workflow_tags.json'
         
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(workflows, f, indent=2)
+        if orjson is not None:
+            payload = orjson.dumps(workflows, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+        else:
+            payload = json.dumps(workflows, indent=2, sort_keys=True).encode('utf-8')
+        
+        # Write to a sibling temp file and swap it in so readers never see a partial file
+        tmp_file = metadata_file.with_suffix('.json.tmp')
+        tmp_file.write_bytes(payload)
+        os.replace(tmp_file, metadata_file)
         
         print(f"Created metadata file: {metadata_file}")
 
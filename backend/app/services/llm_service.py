@@ -4,16 +4,33 @@ Enhanced with RAG, node catalog, and pattern library.
 """
 
 import json
+import os
+import re
+import threading
+import time
 import uuid
-from typing import Dict, Any, Optional, List
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Dict, Any, Optional, List, Iterator, Tuple, ClassVar, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from ..config import get_settings
-from ..models.workflow import WorkflowJSON
+from ..models.workflow import WorkflowJSON, WorkflowGenerationResponse
 from .rag_service import RAGService
+from .openai_client import get_openai_client, warm_openai_connection
 from .node_catalog import get_node_catalog
 from .pattern_library import get_pattern_library
 from .workflow_generator import get_workflow_generator
 from .conversation_manager import ConversationState
+from .response_cache import get_response_cache
+
+class _FallbackCancelled(Exception):
+    """Raised inside a speculative fallback once the enhanced generator has succeeded."""
+
 
 # Try to import enhanced RAG workflow generator
 try:
@@ -23,27 +40,149 @@ except ImportError:
     ENHANCED_GENERATOR_AVAILABLE = False
     print("Warning: Enhanced RAG generator not available")
 
+# Every keyword _parse_requirements_from_request reacts to (substring semantics)
+_REQUIREMENT_KEYWORDS = (
+    'schedule', 'daily', 'cron', 'email', 'receive', 'validat', 'duplicate',
+    'check if exists', 'error', 'retry', 'score', 'priorit', 'rank', 'log',
+    'audit', 'notif', 'alert', 'slack', 'branch', 'condition', 'if', 'gmail',
+    'database', 'postgres', 'mysql', 'google sheets', 'spreadsheet', 'openai',
+    'ai', 'gpt', 'instagram', 'tiktok', 'tik tok', 'twitter', 'x.com',
+    'facebook', 'social media', 'post', 'video', 'ai avatar', 'lead', 'crm'
+)
+
+# Fallback matcher: one C-level regex scan instead of a Python loop of substring tests.
+# Every start position is probed via a lookahead (so overlapping keywords are seen);
+# alternatives are longest-first, and the shorter keywords that are prefixes of the
+# match at that position are added back through _KEYWORD_PREFIXES.
+_KEYWORDS_LONGEST_FIRST = sorted(_REQUIREMENT_KEYWORDS, key=len, reverse=True)
+_KEYWORD_RE = re.compile(
+    "(?=(?:" + "|".join(
+        f"(?P<k{i}>{re.escape(keyword)})" for i, keyword in enumerate(_KEYWORDS_LONGEST_FIRST)
+    ) + "))",
+    re.IGNORECASE
+)
+_KEYWORD_PREFIXES = {
+    f"k{i}": frozenset(k for k in _REQUIREMENT_KEYWORDS if keyword.startswith(k))
+    for i, keyword in enumerate(_KEYWORDS_LONGEST_FIRST)
+}
+
+# Aho-Corasick automaton scans the request once for all keywords (overlaps included)
+try:
+    import ahocorasick
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _keyword in _REQUIREMENT_KEYWORDS:
+        _KEYWORD_AUTOMATON.add_word(_keyword, _keyword)
+    _KEYWORD_AUTOMATON.make_automaton()
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    _KEYWORD_AUTOMATON = None
+    AHOCORASICK_AVAILABLE = False
+
+
+def _match_requirement_keywords(user_request: str) -> set:
+    """Return the set of requirement keywords that occur in the request (case-insensitive)."""
+    if _KEYWORD_AUTOMATON is not None:
+        return {keyword for _, keyword in _KEYWORD_AUTOMATON.iter(user_request.lower())}
+    
+    hits = set()
+    for match in _KEYWORD_RE.finditer(user_request):
+        hits |= _KEYWORD_PREFIXES[match.lastgroup]
+    return hits
+
+
+def _dumps_indented(data: Any) -> str:
+    """Pretty-print JSON for prompts, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(data, indent=2)
+
+
+def _needs_generated_id(node_id: Any) -> bool:
+    """True for missing, empty, non-string or placeholder ('uuid-here') node ids."""
+    return not node_id or not isinstance(node_id, str) or node_id.startswith('uuid')
+
+
+def _workflow_for_prompt(
+    workflow: Optional[Union[WorkflowJSON, Dict[str, Any]]]
+) -> Optional[Union[Dict[str, Any], str]]:
+    """
+    Prepare a previous workflow for embedding in a prompt.
+    
+    Dicts pass through untouched; models are serialized straight to indented
+    JSON by pydantic's serializer instead of being dumped to a dict first.
+    """
+    if workflow is None or isinstance(workflow, dict):
+        return workflow
+    return workflow.model_dump_json(indent=2)
+
+
+# Structured-output response format derived from the response model. Not strict:
+# node parameters and connections are open-ended objects, which strict mode rejects,
+# so _finalize_workflow still runs as a cheap safety net.
+_STRUCTURED_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "WorkflowResponse",
+        "schema": WorkflowGenerationResponse.model_json_schema()
+    }
+}
+
+
+# Static generation instructions that open every LLM user prompt (kept byte-stable for prompt caching)
+_STATIC_INSTRUCTIONS = """# Instructions
+Based on the documentation, recommended nodes, patterns, and request below, generate a complete production-ready n8n workflow.
+
+Requirements:
+- Start with an appropriate trigger node
+- Include ALL necessary nodes for a production system (minimum 5 nodes for non-trivial requests)
+- Add data validation if workflow receives external input
+- Include error handling for complex workflows (Error Trigger workflow)
+- Add conditional logic where appropriate (IF, Switch nodes)
+- Include logging for audit trails
+- Position nodes logically (start at x=240, increment by 220)
+- Generate unique UUIDs for all node IDs
+- Create proper connections between nodes
+- Use descriptive node names
+- Follow n8n best practices
+
+CRITICAL VALIDATION REQUIREMENTS:
+1. Every node MUST include a "parameters" field: "parameters": {}
+2. If parameters is missing or null, it will cause validation errors
+3. Even nodes that don't need parameters must have: "parameters": {}
+4. Example node structure:
+   {
+     "id": "uuid-here",
+     "name": "Node Name", 
+     "type": "n8n-nodes-base.nodeType",
+     "typeVersion": 1,
+     "position": [240, 300],
+     "parameters": {},
+     "credentials": {}
+   }
+
+IMPORTANT: Analyze the complexity of the request:
+- Simple (e.g., "send daily email"): 3-5 nodes
+- Medium (e.g., "process leads"): 6-10 nodes  
+- Complex (e.g., "lead management system"): 12-20+ nodes
+
+For complex requests, include:
+1. Trigger with authentication
+2. Data validation flow
+3. Duplicate checking (if relevant)
+4. Data processing/transformation
+5. Conditional routing
+6. Main actions
+7. Error handling workflow
+8. Logging
+9. Notifications
+
+Remember: Return ONLY valid JSON with "workflowJSON" and "explanation" keys."""
+
+
 class LLMService:
     """Handles LLM interaction for workflow generation."""
     
-    def __init__(self):
-        self.settings = get_settings()
-        self.openai_client = OpenAI(api_key=self.settings.openai_api_key)
-        self.rag_service = RAGService()
-        self.node_catalog = get_node_catalog()
-        self.pattern_library = get_pattern_library()
-        self.workflow_generator = get_workflow_generator()
-        
-        # Initialize enhanced RAG generator if available
-        self.enhanced_generator = None
-        if ENHANCED_GENERATOR_AVAILABLE:
-            try:
-                self.enhanced_generator = get_rag_workflow_generator()
-                print("✓ Enhanced RAG workflow generator initialized")
-            except Exception as e:
-                print(f"Warning: Could not initialize enhanced generator: {e}")
-        
-        self.system_prompt = """You are an expert n8n workflow architect. Your task is to generate production-ready, complex n8n workflows based on user requests.
+    SYSTEM_PROMPT: ClassVar[str] = """You are an expert n8n workflow architect. Your task is to generate production-ready, complex n8n workflows based on user requests.
 
 CRITICAL RULES:
 1. ALWAYS return a valid JSON object with exactly two keys: "workflowJSON" and "explanation"
@@ -124,10 +263,51 @@ CREDENTIAL EXAMPLES:
 
 Use the provided documentation to ensure accuracy and follow n8n best practices."""
     
+    def __init__(self):
+        self.settings = get_settings()
+        self.openai_client = get_openai_client()
+    
+    # Heavy collaborators are built on first use so constructing LLMService is cheap
+    # and each request path only pays for what it touches.
+    
+    @cached_property
+    def rag_service(self) -> RAGService:
+        return RAGService()
+    
+    @cached_property
+    def node_catalog(self):
+        return get_node_catalog()
+    
+    @cached_property
+    def pattern_library(self):
+        return get_pattern_library()
+    
+    @cached_property
+    def workflow_generator(self):
+        return get_workflow_generator()
+    
+    @cached_property
+    def response_cache(self):
+        return get_response_cache()
+    
+    @cached_property
+    def enhanced_generator(self):
+        """Enhanced RAG generator, or None if unavailable."""
+        if not ENHANCED_GENERATOR_AVAILABLE:
+            return None
+        try:
+            generator = get_rag_workflow_generator()
+            print("✓ Enhanced RAG workflow generator initialized")
+            return generator
+        except Exception as e:
+            print(f"Warning: Could not initialize enhanced generator: {e}")
+            return None
+
+    
     def generate_workflow(
         self,
         user_request: str,
-        previous_workflow: Optional[WorkflowJSON] = None,
+        previous_workflow: Optional[Union[WorkflowJSON, Dict[str, Any]]] = None,
         conversation_context: Optional[str] = None,
         requirements: Optional[Dict[str, Any]] = None,
         use_enhanced_generation: bool = True,
@@ -139,6 +319,7 @@ Use the provided documentation to ensure accuracy and follow n8n best practices.
         Args:
             user_request: User's description of desired workflow
             previous_workflow: Optional previous workflow for modifications
+                (a WorkflowJSON model or an already-materialized dict)
             conversation_context: Optional conversation history
             requirements: Optional requirements from conversation
             use_enhanced_generation: Use enhanced workflow generator if True
@@ -146,45 +327,135 @@ Use the provided documentation to ensure accuracy and follow n8n best practices.
         Returns:
             Dict with workflowJSON and explanation
         """
-        # Try enhanced RAG generator first if available
-        if use_enhanced_generation and self.enhanced_generator:
+        # Only stateless requests on the default (enhanced) path are cached; edits and
+        # conversations depend on more than the text, and the key does not record the path
+        cacheable = self.settings.response_cache_enabled and use_enhanced_generation and not (
+            previous_workflow or existing_workflow or conversation_context or requirements
+        )
+        # The cache keeps the normalized float32 vector; retrieval takes a plain list
+        cache_embedding = None
+        query_embedding = None
+        if cacheable:
+            cached, cache_embedding = self.response_cache.lookup(
+                user_request,
+                embed=self._embed_request
+            )
+            if cached is not None:
+                print("Returning cached workflow response")
+                return cached
+            if cache_embedding is not None:
+                query_embedding = cache_embedding.tolist()
+        
+        result = self._generate_uncached(
+            user_request,
+            previous_workflow,
+            conversation_context,
+            requirements,
+            use_enhanced_generation,
+            existing_workflow,
+            query_embedding
+        )
+        
+        if cacheable:
+            self.response_cache.put(user_request, result, embedding=cache_embedding)
+        
+        return result
+    
+    def _embed_request(self, text: str) -> List[float]:
+        """Embed a request for the response cache without building the RAG service."""
+        response = self.openai_client.embeddings.create(
+            model=self.settings.embedding_model,
+            input=text
+        )
+        return response.data[0].embedding
+    
+    def _generate_uncached(
+        self,
+        user_request: str,
+        previous_workflow: Optional[Union[WorkflowJSON, Dict[str, Any]]],
+        conversation_context: Optional[str],
+        requirements: Optional[Dict[str, Any]],
+        use_enhanced_generation: bool,
+        existing_workflow: Optional[Dict[str, Any]],
+        query_embedding: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
+        """Run the generation pipeline without consulting the response cache."""
+        use_enhanced = use_enhanced_generation and self.enhanced_generator is not None
+        
+        # Build requirements from user request if not provided
+        if use_enhanced and not requirements:
+            requirements = self._parse_requirements_from_request(user_request)
+        
+        def fallback(cancelled: Optional[threading.Event] = None) -> Dict[str, Any]:
+            # If we have requirements and enhanced generation is enabled, use the new generator
+            if use_enhanced_generation and requirements and requirements.get("trigger"):
+                return self._generate_with_requirements(user_request, requirements)
+            
+            # Otherwise, use LLM-based generation with enhanced context
+            # Use existing_workflow if provided, otherwise use previous_workflow
+            workflow_to_use = existing_workflow or _workflow_for_prompt(previous_workflow)
+            return self._generate_with_llm(
+                user_request,
+                workflow_to_use,
+                conversation_context,
+                query_embedding,
+                cancelled=cancelled
+            )
+        
+        if not use_enhanced:
+            return fallback()
+        
+        if not self.settings.speculative_fallback:
+            # Try enhanced RAG generator first, fall back only on failure
             try:
-                print("Using Enhanced RAG Workflow Generator...")
-                
-                # Build requirements from user request if not provided
-                if not requirements:
-                    requirements = self._parse_requirements_from_request(user_request)
-                
-                # Generate with enhanced generator
-                result = self.enhanced_generator.generate(requirements)
-                
-                # Format result
-                if isinstance(result, dict) and 'nodes' in result:
-                    # Direct workflow JSON
-                    return {
-                        "workflowJSON": result,
-                        "explanation": self._create_workflow_explanation(result, requirements, user_request)
-                    }
-                else:
-                    # Already formatted result
-                    return result
-                    
+                return self._generate_with_enhanced(user_request, requirements)
             except Exception as e:
                 print(f"Enhanced generator failed: {e}")
                 print("Falling back to LLM-based generation...")
-        
-        # If we have requirements and enhanced generation is enabled, use the new generator
-        if use_enhanced_generation and requirements and requirements.get("trigger"):
-            return self._generate_with_requirements(user_request, requirements)
-        
-        # Otherwise, use LLM-based generation with enhanced context
-        # Use existing_workflow if provided, otherwise use previous_workflow
-        workflow_to_use = existing_workflow or (previous_workflow.model_dump() if previous_workflow else None)
-        return self._generate_with_llm(
-            user_request,
-            workflow_to_use,
-            conversation_context
-        )
+            return fallback()
+        
+        # Speculative mode: run the fallback concurrently so an enhanced failure
+        # costs max(enhanced, fallback) instead of their sum. The enhanced result
+        # still wins whenever it succeeds; the event then stops the fallback before
+        # or during its LLM call (Future.cancel() cannot stop a task already running).
+        cancelled = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=1)
+        fallback_future = executor.submit(fallback, cancelled)
+        try:
+            result = self._generate_with_enhanced(user_request, requirements)
+            cancelled.set()
+            return result
+        except Exception as e:
+            print(f"Enhanced generator failed: {e}")
+            print("Using speculative fallback result...")
+            return fallback_future.result()
+        finally:
+            executor.shutdown(wait=False)
+    
+    def _generate_with_enhanced(
+        self,
+        user_request: str,
+        requirements: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Generate with the enhanced RAG generator; raises on failure."""
+        print("Using Enhanced RAG Workflow Generator...")
+        
+        # Generate with enhanced generator
+        result = self.enhanced_generator.generate(requirements)
+        
+        # Format result
+        if isinstance(result, dict) and 'nodes' in result:
+            # Direct workflow JSON
+            result = self._finalize_workflow(result)
+            return {
+                "workflowJSON": result,
+                "explanation": self._create_workflow_explanation(result, requirements, user_request)
+            }
+        
+        # Already formatted result
+        if isinstance(result, dict) and isinstance(result.get('workflowJSON'), dict):
+            result['workflowJSON'] = self._finalize_workflow(result['workflowJSON'])
+        return result
     
     def _generate_with_requirements(
         self,
@@ -215,8 +486,10 @@ Use the provided documentation to ensure accuracy and follow n8n best practices.
     def _generate_with_llm(
         self,
         user_request: str,
-        previous_workflow: Optional[Dict[str, Any]] = None,
-        conversation_context: Optional[str] = None
+        previous_workflow: Optional[Union[Dict[str, Any], str]] = None,
+        conversation_context: Optional[str] = None,
+        query_embedding: Optional[List[float]] = None,
+        cancelled: Optional[threading.Event] = None
     ) -> Dict[str, Any]:
         """
         Generate workflow using LLM with enhanced context.
@@ -225,23 +498,166 @@ Use the provided documentation to ensure accuracy and follow n8n best practices.
             user_request: User's request
             previous_workflow: Optional previous workflow
             conversation_context: Optional conversation history
+            query_embedding: Optional precomputed embedding of user_request
+            cancelled: Set by a speculative caller that no longer needs the result;
+                checked before the completion starts and between streamed chunks
             
         Returns:
             Dict with workflowJSON and explanation
         """
-        # Get relevant context from RAG
-        rag_context = self.rag_service.get_context_for_generation(user_request)
+        user_prompt = self._prepare_llm_prompt(
+            user_request,
+            previous_workflow,
+            conversation_context,
+            query_embedding
+        )
+        
+        if cancelled is None:
+            # Stream the completion and parse once the full JSON has arrived
+            content = "".join(self._stream_llm_completion(user_prompt))
+            return self._parse_llm_response(content)
+        
+        if cancelled.is_set():
+            raise _FallbackCancelled()
+        
+        chunks = []
+        stream = self._stream_llm_completion(user_prompt)
+        try:
+            for chunk in stream:
+                if cancelled.is_set():
+                    raise _FallbackCancelled()
+                chunks.append(chunk)
+        finally:
+            # Closes the HTTP response so OpenAI stops generating a cancelled completion
+            stream.close()
+        return self._parse_llm_response("".join(chunks))
+    
+    def generate_workflow_stream(
+        self,
+        user_request: str,
+        previous_workflow: Optional[Union[WorkflowJSON, Dict[str, Any]]] = None,
+        conversation_context: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Generate workflow using LLM, yielding progress as tokens arrive.
+        
+        Args:
+            user_request: User's request
+            previous_workflow: Optional previous workflow
+            conversation_context: Optional conversation history
+            
+        Yields:
+            {"type": "delta", "content": str} for each streamed chunk, then a
+            final {"type": "result", "result": {workflowJSON, explanation}}
+        """
+        user_prompt = self._prepare_llm_prompt(
+            user_request,
+            _workflow_for_prompt(previous_workflow),
+            conversation_context
+        )
+        
+        buffer = []
+        for delta in self._stream_llm_completion(user_prompt):
+            buffer.append(delta)
+            yield {"type": "delta", "content": delta}
+        
+        yield {"type": "result", "result": self._parse_llm_response("".join(buffer))}
+    
+    def generate_workflow_batch(
+        self,
+        user_requests: List[str],
+        poll_interval: float = 30.0,
+        timeout: float = 24 * 3600
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Generate workflows for many requests through the OpenAI Batch API.
+        
+        Intended for non-interactive jobs (backfills, pre-generating template
+        variants): requests are billed at the batch discount and may take up
+        to the 24h completion window. Blocks until the batch finishes.
+        
+        Args:
+            user_requests: Workflow requests to generate
+            poll_interval: Seconds between batch status checks
+            timeout: Maximum seconds to wait for the batch
+            
+        Returns:
+            One {workflowJSON, explanation} dict per request, in input order;
+            None for requests that failed inside the batch
+        """
+        if not user_requests:
+            return []
+        
+        lines = []
+        for index, user_request in enumerate(user_requests):
+            user_prompt = self._prepare_llm_prompt(user_request, None, None)
+            lines.append(json.dumps({
+                "custom_id": f"request-{index}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._chat_completion_params(user_prompt)
+            }))
+        
+        batch_file = self.openai_client.files.create(
+            file=("workflow_batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = self.openai_client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        print(f"Submitted workflow batch {batch.id} with {len(lines)} requests")
+        
+        deadline = time.monotonic() + timeout
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Workflow batch {batch.id} did not finish within {timeout}s")
+            time.sleep(poll_interval)
+            batch = self.openai_client.batches.retrieve(batch.id)
+        
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"Workflow batch {batch.id} ended with status '{batch.status}'")
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(user_requests)
+        output = self.openai_client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            index = int(record["custom_id"].rsplit("-", 1)[1])
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                print(f"Warning: Batch request {record['custom_id']} failed: {record.get('error')}")
+                continue
+            try:
+                content = response["body"]["choices"][0]["message"]["content"]
+                results[index] = self._parse_llm_response(content)
+            except Exception as e:
+                print(f"Warning: Could not parse batch result {record['custom_id']}: {e}")
         
-        # Find relevant nodes
-        relevant_nodes = self.node_catalog.find_best_nodes_for_request(user_request)
-        node_context = self._format_node_recommendations(relevant_nodes[:5])
+        return results
+    
+    def _prepare_llm_prompt(
+        self,
+        user_request: str,
+        previous_workflow: Optional[Union[Dict[str, Any], str]],
+        conversation_context: Optional[str],
+        query_embedding: Optional[List[float]] = None
+    ) -> str:
+        """Run retrieval and build the user prompt for LLM generation."""
+        # Overlap OpenAI connection setup with retrieval
+        warm_openai_connection()
         
-        # Find relevant patterns
-        relevant_patterns = self.pattern_library.find_patterns_for_request(user_request)
-        pattern_context = self._format_pattern_recommendations(relevant_patterns[:3])
+        rag_context, relevant_nodes, relevant_patterns = self._retrieve_context(
+            user_request,
+            query_embedding
+        )
+        node_context = self._format_node_recommendations(relevant_nodes)
+        pattern_context = self._format_pattern_recommendations(relevant_patterns)
         
         # Build enhanced user prompt
-        user_prompt = self._build_enhanced_prompt(
+        return self._build_enhanced_prompt(
             user_request,
             rag_context,
             node_context,
@@ -249,26 +665,75 @@ Use the provided documentation to ensure accuracy and follow n8n best practices.
             previous_workflow,
             conversation_context
         )
+    
+    def _retrieve_context(
+        self,
+        user_request: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[str, List[Any], List[Any]]:
+        """
+        Run RAG, node and pattern retrieval concurrently in one round-trip.
         
-        # Call OpenAI
-        response = self.openai_client.chat.completions.create(
-            model=self.settings.openai_model,
-            messages=[
-                {"role": "system", "content": self.system_prompt},
+        The query is embedded at most once; pass query_embedding to reuse one
+        computed earlier (e.g. by the response cache lookup).
+        """
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            rag_future = executor.submit(
+                self.rag_service.get_context_for_generation,
+                user_request,
+                query_embedding=query_embedding
+            )
+            nodes_future = executor.submit(
+                self.node_catalog.find_top_k_for_request,
+                user_request,
+                5
+            )
+            patterns_future = executor.submit(
+                self.pattern_library.find_top_k_for_request,
+                user_request,
+                3
+            )
+            return rag_future.result(), nodes_future.result(), patterns_future.result()
+    
+    def _chat_completion_params(self, user_prompt: str) -> Dict[str, Any]:
+        """Build the chat completion request body shared by live and batch calls."""
+        return {
+            "model": self.settings.openai_model,
+            "messages": [
+                {"role": "system", "content": self.SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
-            temperature=self.settings.temperature,
-            max_tokens=self.settings.max_tokens,
-            response_format={"type": "json_object"}
+            "temperature": self.settings.temperature,
+            "max_tokens": self.settings.max_tokens,
+            "response_format": _STRUCTURED_RESPONSE_FORMAT if self.settings.structured_outputs
+                               else {"type": "json_object"}
+        }
+    
+    def _stream_llm_completion(self, user_prompt: str) -> Iterator[str]:
+        """Call OpenAI with streaming enabled and yield content deltas."""
+        stream = self.openai_client.chat.completions.create(
+            **self._chat_completion_params(user_prompt),
+            stream=True
         )
         
-        # Parse response
-        result = json.loads(response.choices[0].message.content)
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        finally:
+            # Runs when a consumer stops early too, releasing the connection
+            stream.close()
+    
+    def _parse_llm_response(self, content: str) -> Dict[str, Any]:
+        """Parse the final LLM JSON and normalize the workflow."""
+        result = orjson.loads(content) if orjson is not None else json.loads(content)
         
         # Ensure UUIDs are generated and parameters exist
-        if 'workflowJSON' in result:
-            result['workflowJSON'] = self._ensure_uuids(result['workflowJSON'])
-            result['workflowJSON'] = self._ensure_parameters(result['workflowJSON'])
+        if isinstance(result.get('workflowJSON'), dict):
+            result['workflowJSON'] = self._finalize_workflow(result['workflowJSON'])
         
         return result
     
@@ -282,7 +747,7 @@ Use the provided documentation to ensure accuracy and follow n8n best practices.
         node_count = len(workflow.get("nodes", []))
         complexity = workflow.get("meta", {}).get("complexity", 0)
         
-        explanation = f"""# {workflow.get('name', 'Generated Workflow')}
+        parts = [f"""# {workflow.get('name', 'Generated Workflow')}
 
 This workflow was generated based on your request: "{user_request}"
 
@@ -291,67 +756,70 @@ This workflow was generated based on your request: "{user_request}"
 - **Complexity Score**: {complexity}/10
 - **Trigger Type**: {requirements.get('trigger', 'Not specified').title()}
 
-## Key Features"""
+## Key Features"""]
         
         if requirements.get("needs_validation"):
-            explanation += "\n- ✅ **Data Validation**: Validates incoming data and rejects invalid entries"
+            parts.append("- ✅ **Data Validation**: Validates incoming data and rejects invalid entries")
         
         if requirements.get("needs_duplicate_check"):
-            explanation += "\n- ✅ **Duplicate Prevention**: Checks database to avoid duplicate records"
+            parts.append("- ✅ **Duplicate Prevention**: Checks database to avoid duplicate records")
         
         if requirements.get("needs_error_handling"):
-            explanation += "\n- ✅ **Error Handling**: Comprehensive error workflow with retry logic"
+            parts.append("- ✅ **Error Handling**: Comprehensive error workflow with retry logic")
         
         if requirements.get("has_branching"):
-            explanation += "\n- ✅ **Conditional Routing**: Routes data based on priority/conditions"
+            parts.append("- ✅ **Conditional Routing**: Routes data based on priority/conditions")
         
         if requirements.get("needs_logging"):
-            explanation += "\n- ✅ **Audit Logging**: Logs all operations to database"
+            parts.append("- ✅ **Audit Logging**: Logs all operations to database")
         
         outputs = requirements.get("outputs", [])
         if outputs:
             output_str = ", ".join(outputs)
-            explanation += f"\n- ✅ **Output Channels**: {output_str.title()}"
+            parts.append(f"- ✅ **Output Channels**: {output_str.title()}")
         
-        explanation += "\n\n## Next Steps\n"
-        explanation += "1. Import this workflow into your n8n instance\n"
-        explanation += "2. Configure credentials for nodes that require them\n"
-        explanation += "3. Update placeholder values (API keys, database names, etc.)\n"
-        explanation += "4. Test the workflow with sample data\n"
-        explanation += "5. Activate the workflow when ready"
-        
-        return explanation
+        parts.extend([
+            "",
+            "## Next Steps",
+            "1. Import this workflow into your n8n instance",
+            "2. Configure credentials for nodes that require them",
+            "3. Update placeholder values (API keys, database names, etc.)",
+            "4. Test the workflow with sample data",
+            "5. Activate the workflow when ready"
+        ])
+        
+        return "\n".join(parts)
     
     def _format_node_recommendations(self, nodes: List[Any]) -> str:
         """Format node recommendations for prompt."""
         if not nodes:
             return ""
         
-        formatted = "\n# Recommended Nodes for this Workflow\n\n"
+        parts = ["\n# Recommended Nodes for this Workflow\n\n"]
         for node in nodes:
-            formatted += f"## {node.node_type}\n"
-            formatted += f"- **Purpose**: {node.purpose}\n"
-            formatted += f"- **Use Cases**: {', '.join(node.use_cases[:2])}\n"
+            parts.append(f"## {node.node_type}\n")
+            parts.append(f"- **Purpose**: {node.purpose}\n")
+            parts.append(f"- **Use Cases**: {', '.join(node.use_cases[:2])}\n")
             if node.requires_credentials:
-                formatted += f"- **Requires Credentials**: {', '.join(node.credential_types)}\n"
-            formatted += "\n"
+                parts.append(f"- **Requires Credentials**: {', '.join(node.credential_types)}\n")
+            parts.append("\n")
         
-        return formatted
+        return "".join(parts)
     
     def _format_pattern_recommendations(self, patterns: List[Any]) -> str:
         """Format pattern recommendations for prompt."""
         if not patterns:
             return ""
         
-        formatted = "\n# Recommended Patterns for this Workflow\n\n"
+        parts = ["\n# Recommended Patterns for this Workflow\n\n"]
         for pattern in patterns:
-            formatted += f"## {pattern.name}\n"
-            formatted += f"- **Description**: {pattern.description}\n"
-            formatted += f"- **Complexity**: {pattern.complexity_score}/10\n"
-            formatted += f"- **When to Use**: {', '.join(pattern.when_to_use[:2])}\n"
-            formatted += "\n"
+            parts.append(f"## {pattern.name}\n")
+            parts.append(f"- **Description**: {pattern.description}\n")
+            parts.append(f"- **Complexity**: {pattern.complexity_score}/10\n")
+            parts.append(f"- **When to Use**: {', '.join(pattern.when_to_use[:2])}\n")
+            parts.append("\n")
         
-        return formatted
+        return "".join(parts)
     
     def _build_enhanced_prompt(
         self,
@@ -359,14 +827,27 @@ This workflow was generated based on your request: "{user_request}"
         rag_context: str,
         node_context: str,
         pattern_context: str,
-        previous_workflow: Optional[Dict[str, Any]],
+        previous_workflow: Optional[Union[Dict[str, Any], str]],
         conversation_context: Optional[str]
     ) -> str:
-        """Build enhanced user prompt with all context."""
-        prompt_parts = []
+        """
+        Build enhanced user prompt with all context.
+        
+        The static instructions always come first so that system prompt +
+        instructions form a byte-stable prefix across calls (eligible for
+        OpenAI automatic prompt caching). Dynamic sections follow in a fixed
+        order, with conversation specifications first as highest priority.
+        """
+        # Add enhanced instructions
+        prompt_parts = [_STATIC_INSTRUCTIONS]
+        
+        # Add conversation context if exists (with higher priority)
+        if conversation_context:
+            prompt_parts.append(f"\n# DETAILED WORKFLOW SPECIFICATIONS (HIGHEST PRIORITY)\n{conversation_context}\n\nYou MUST follow these specifications exactly. They were gathered through a detailed conversation with the user and represent their precise requirements.\n")
         
         # Add RAG context
-        prompt_parts.append(rag_context)
+        if rag_context:
+            prompt_parts.append(rag_context)
         
         # Add node recommendations
         if node_context:
@@ -376,68 +857,14 @@ This workflow was generated based on your request: "{user_request}"
         if pattern_context:
             prompt_parts.append(pattern_context)
         
-        # Add conversation context if exists (with higher priority)
-        if conversation_context:
-            prompt_parts.insert(0, f"\n# DETAILED WORKFLOW SPECIFICATIONS (HIGHEST PRIORITY)\n{conversation_context}\n\nYou MUST follow these specifications exactly. They were gathered through a detailed conversation with the user and represent their precise requirements.\n")
-        
         # Add previous workflow if exists
         if previous_workflow:
-            prompt_parts.append(f"\n# Current Workflow (to be modified)\n```json\n{json.dumps(previous_workflow, indent=2)}\n```\n")
+            workflow_json = previous_workflow if isinstance(previous_workflow, str) else _dumps_indented(previous_workflow)
+            prompt_parts.append(f"\n# Current Workflow (to be modified)\n```json\n{workflow_json}\n```\n")
         
         # Add user request
         prompt_parts.append(f"\n# User Request\n{user_request}\n")
         
-        # Add enhanced instructions
-        prompt_parts.append("""
-# Instructions
-Based on the above documentation, recommended nodes, patterns, and request, generate a complete production-ready n8n workflow.
-
-Requirements:
-- Start with an appropriate trigger node
-- Include ALL necessary nodes for a production system (minimum 5 nodes for non-trivial requests)
-- Add data validation if workflow receives external input
-- Include error handling for complex workflows (Error Trigger workflow)
-- Add conditional logic where appropriate (IF, Switch nodes)
-- Include logging for audit trails
-- Position nodes logically (start at x=240, increment by 220)
-- Generate unique UUIDs for all node IDs
-- Create proper connections between nodes
-- Use descriptive node names
-- Follow n8n best practices
-
-CRITICAL VALIDATION REQUIREMENTS:
-1. Every node MUST include a "parameters" field: "parameters": {}
-2. If parameters is missing or null, it will cause validation errors
-3. Even nodes that don't need parameters must have: "parameters": {}
-4. Example node structure:
-   {
-     "id": "uuid-here",
-     "name": "Node Name", 
-     "type": "n8n-nodes-base.nodeType",
-     "typeVersion": 1,
-     "position": [240, 300],
-     "parameters": {},
-     "credentials": {}
-   }
-
-IMPORTANT: Analyze the complexity of the request:
-- Simple (e.g., "send daily email"): 3-5 nodes
-- Medium (e.g., "process leads"): 6-10 nodes  
-- Complex (e.g., "lead management system"): 12-20+ nodes
-
-For complex requests, include:
-1. Trigger with authentication
-2. Data validation flow
-3. Duplicate checking (if relevant)
-4. Data processing/transformation
-5. Conditional routing
-6. Main actions
-7. Error handling workflow
-8. Logging
-9. Notifications
-
-Remember: Return ONLY valid JSON with "workflowJSON" and "explanation" keys.""")
-        
         return "\n".join(prompt_parts)
     
     def _build_user_prompt(
@@ -458,29 +885,35 @@ Remember: Return ONLY valid JSON with "workflowJSON" and "explanation" keys.""")
             conversation_context
         )
     
-    def _ensure_uuids(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
-        """Ensure all nodes have valid UUIDs."""
-        if 'nodes' in workflow:
-            for node in workflow['nodes']:
-                if 'id' not in node or not node['id'] or node['id'].startswith('uuid'):
-                    node['id'] = str(uuid.uuid4())
-        return workflow
-    
-    def _ensure_parameters(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
-        """Ensure all nodes have a parameters field."""
-        if 'nodes' in workflow:
-            for node in workflow['nodes']:
-                # Ensure parameters field exists
-                if 'parameters' not in node:
-                    node['parameters'] = {}
-                # Ensure parameters is a dict, not None
-                elif node['parameters'] is None:
-                    node['parameters'] = {}
+    def _finalize_workflow(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Normalize generated nodes in a single pass.
+        
+        Ensures every node has a dict "parameters" field and a valid UUID;
+        nodes needing new ids get them from one urandom call afterwards.
+        """
+        needs_id = []
+        for node in workflow.get('nodes', ()):
+            # Ensure parameters field exists and is a dict, not None
+            if node.get('parameters') is None:
+                node['parameters'] = {}
+            if _needs_generated_id(node.get('id')):
+                needs_id.append(node)
+        
+        if needs_id:
+            # One urandom call for all new ids instead of one per uuid4()
+            raw = os.urandom(16 * len(needs_id))
+            for i, node in enumerate(needs_id):
+                node['id'] = str(uuid.UUID(bytes=raw[i * 16:(i + 1) * 16], version=4))
+        
         return workflow
     
     def _parse_requirements_from_request(self, user_request: str) -> Dict[str, Any]:
         """Parse requirements from user request."""
-        request_lower = user_request.lower()
+        hits = _match_requirement_keywords(user_request)
+        
+        def has(*keywords: str) -> bool:
+            return not hits.isdisjoint(keywords)
         
         requirements = {
             'trigger': 'webhook',
@@ -497,63 +930,62 @@ Remember: Return ONLY valid JSON with "workflowJSON" and "explanation" keys.""")
         }
         
         # Detect trigger type
-        if 'schedule' in request_lower or 'daily' in request_lower or 'cron' in request_lower:
+        if has('schedule', 'daily', 'cron'):
             requirements['trigger'] = 'schedule'
-        elif 'email' in request_lower and 'receive' in request_lower:
+        elif has('email') and has('receive'):
             requirements['trigger'] = 'email'
         
         # Detect needs
-        if 'validat' in request_lower:
+        if has('validat'):
             requirements['needs_validation'] = True
-        if 'duplicate' in request_lower or 'check if exists' in request_lower:
+        if has('duplicate', 'check if exists'):
             requirements['needs_duplicate_check'] = True
-        if 'error' in request_lower or 'retry' in request_lower:
+        if has('error', 'retry'):
             requirements['needs_error_handling'] = True
-        if 'score' in request_lower or 'priorit' in request_lower or 'rank' in request_lower:
+        if has('score', 'priorit', 'rank'):
             requirements['needs_scoring'] = True
             requirements['has_branching'] = True
-        if 'log' in request_lower or 'audit' in request_lower:
+        if has('log', 'audit'):
             requirements['needs_logging'] = True
-        if 'notif' in request_lower or 'alert' in request_lower or 'slack' in request_lower:
+        if has('notif', 'alert', 'slack'):
             requirements['needs_notification'] = True
-        if 'branch' in request_lower or 'condition' in request_lower or 'if' in request_lower:
+        if has('branch', 'condition', 'if'):
             requirements['has_branching'] = True
         
         # Detect outputs/integrations
         integrations = []
-        if 'email' in request_lower or 'gmail' in request_lower:
+        if has('email', 'gmail'):
             requirements['outputs'].append('email')
             integrations.append('email')
-        if 'slack' in request_lower:
+        if has('slack'):
             requirements['outputs'].append('slack')
             integrations.append('slack')
-        if 'database' in request_lower or 'postgres' in request_lower or 'mysql' in request_lower:
+        if has('database', 'postgres', 'mysql'):
             requirements['outputs'].append('database')
             integrations.append('database')
-        if 'google sheets' in request_lower or 'spreadsheet' in request_lower:
+        if has('google sheets', 'spreadsheet'):
             integrations.append('google_sheets')
-        if 'openai' in request_lower or 'ai' in request_lower or 'gpt' in request_lower:
+        if has('openai', 'ai', 'gpt'):
             integrations.append('openai')
-        if 'instagram' in request_lower:
+        if has('instagram'):
             integrations.append('instagram')
-        if 'tiktok' in request_lower or 'tik tok' in request_lower:
+        if has('tiktok', 'tik tok'):
             integrations.append('tiktok')
-        if 'twitter' in request_lower or 'x.com' in request_lower:
+        if has('twitter', 'x.com'):
             integrations.append('twitter')
-        if 'facebook' in request_lower:
+        if has('facebook'):
             integrations.append('facebook')
         
         requirements['integrations'] = integrations
         
         # Detect use case
-        if 'social media' in request_lower or 'post' in request_lower:
+        if has('social media', 'post'):
             requirements['use_case'] = 'social_media'
-        elif 'video' in request_lower or 'ai avatar' in request_lower:
+        elif has('video', 'ai avatar'):
             requirements['use_case'] = 'ai_video'
-        elif 'lead' in request_lower or 'crm' in request_lower:
+        elif has('lead', 'crm'):
             requirements['use_case'] = 'crm'
-        elif 'email' in request_lower:
+        elif has('email'):
             requirements['use_case'] = 'email_automation'
         
         return requirements
-
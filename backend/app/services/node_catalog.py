@@ -3,24 +3,49 @@ Node Capability Catalog for n8n nodes.
 Comprehensive database of n8n node types, capabilities, and usage patterns.
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
+from functools import lru_cache
+import heapq
 import json
+import re
+import sys
 
+import numpy as np
 
-@dataclass
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@dataclass(slots=True, frozen=True)
 class NodeCapability:
     """Represents capabilities of an n8n node."""
     
     node_type: str
     category: str
     purpose: str
-    use_cases: List[str]
+    use_cases: Tuple[str, ...]
     parameters: Dict[str, Any] = field(default_factory=dict)
-    common_combinations: List[List[str]] = field(default_factory=list)
-    code_examples: List[Dict[str, str]] = field(default_factory=list)
+    common_combinations: Tuple[Tuple[str, ...], ...] = field(default_factory=tuple)
+    code_examples: Tuple[Dict[str, str], ...] = field(default_factory=tuple)
     requires_credentials: bool = False
-    credential_types: List[str] = field(default_factory=list)
+    credential_types: Tuple[str, ...] = field(default_factory=tuple)
+    
+    def __post_init__(self):
+        # Interned keys let dict lookups and comparisons short-circuit on identity
+        object.__setattr__(self, 'node_type', sys.intern(self.node_type))
+        object.__setattr__(self, 'category', sys.intern(self.category))
+        
+        # Catalog entries are read-only, so store sequences as compact tuples
+        object.__setattr__(self, 'use_cases', tuple(self.use_cases))
+        object.__setattr__(
+            self, 'common_combinations',
+            tuple(tuple(combo) for combo in self.common_combinations)
+        )
+        object.__setattr__(self, 'code_examples', tuple(self.code_examples))
+        object.__setattr__(self, 'credential_types', tuple(self.credential_types))
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -42,6 +67,70 @@ class NodeCatalog:
     
     def __init__(self):
         self.nodes = self._build_catalog()
+        self._json_cache: Optional[str] = None
+        self._build_lookup_indexes()
+        self._build_scoring_index()
+    
+    def _build_lookup_indexes(self):
+        """Precompute category buckets and lowercased texts for the lookup methods."""
+        # Short names, prefixed short names and full node types all resolve directly
+        self._node_lookup: Dict[str, NodeCapability] = {}
+        for name, node in self.nodes.items():
+            self._node_lookup[node.node_type] = node
+            self._node_lookup[f"n8n-nodes-base.{name}"] = node
+        self._node_lookup.update(self.nodes)
+        
+        self._by_category: Dict[str, List[NodeCapability]] = {}
+        for node in self.nodes.values():
+            self._by_category.setdefault(node.category, []).append(node)
+        self._all_categories = tuple(set(node.category for node in self.nodes.values()))
+    
+    def _build_scoring_index(self):
+        """
+        Precompute arrays used to score all nodes against a request at once.
+        
+        Fields are laid out column-wise (parallel lists indexed like self._node_list)
+        so scans only touch the text they need. Use-case texts are also flattened;
+        a (nodes x use cases) ownership matrix turns per-use-case hits into
+        per-node counts with one matmul.
+        """
+        self._node_list = list(self.nodes.values())
+        self._purpose_texts = [node.purpose.lower() for node in self._node_list]
+        self._node_use_case_texts = [
+            [uc.lower() for uc in node.use_cases] for node in self._node_list
+        ]
+        self._use_case_texts = [uc.lower() for node in self._node_list for uc in node.use_cases]
+        
+        self._use_case_owner = np.zeros((len(self._node_list), len(self._use_case_texts)), dtype=np.int32)
+        column = 0
+        for row, node in enumerate(self._node_list):
+            for _ in node.use_cases:
+                self._use_case_owner[row, column] = 1
+                column += 1
+        
+        self._categories = sorted({node.category for node in self._node_list})
+        self._category_index = np.array(
+            [self._categories.index(node.category) for node in self._node_list],
+            dtype=np.intp
+        )
+        
+        # Memoized per-word hit vectors and rankings (catalog is immutable at runtime)
+        self._word_hits = lru_cache(maxsize=4096)(self._compute_word_hits)
+        self._ranked_cached = lru_cache(maxsize=1024)(self._rank_request)
+    
+    def _compute_word_hits(self, word: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Boolean vectors marking purposes and use cases that contain word."""
+        purpose_hits = np.fromiter(
+            (word in text for text in self._purpose_texts),
+            dtype=bool,
+            count=len(self._purpose_texts)
+        )
+        use_case_hits = np.fromiter(
+            (word in text for text in self._use_case_texts),
+            dtype=bool,
+            count=len(self._use_case_texts)
+        )
+        return purpose_hits, use_case_hits
     
     def _build_catalog(self) -> Dict[str, NodeCapability]:
         """Build comprehensive node catalog."""
@@ -445,61 +534,107 @@ return items.map(item => ({
         return catalog
     
     def get_node(self, node_type: str) -> Optional[NodeCapability]:
-        """Get node capability by type."""
-        # Remove prefix if present
-        clean_type = node_type.replace("n8n-nodes-base.", "")
-        return self.nodes.get(clean_type)
+        """Get node capability by short name or full node type."""
+        return self._node_lookup.get(node_type)
     
     def get_by_category(self, category: str) -> List[NodeCapability]:
         """Get all nodes in a category."""
-        return [
-            node for node in self.nodes.values()
-            if node.category == category
-        ]
+        return list(self._by_category.get(category, ()))
     
     def get_by_use_case(self, use_case_keyword: str) -> List[NodeCapability]:
         """Find nodes that match a use case keyword."""
         keyword_lower = use_case_keyword.lower()
         matching = []
         
-        for node in self.nodes.values():
-            if any(keyword_lower in uc.lower() for uc in node.use_cases):
-                matching.append(node)
-            elif keyword_lower in node.purpose.lower():
-                matching.append(node)
+        for i, use_cases_lower in enumerate(self._node_use_case_texts):
+            if any(keyword_lower in uc for uc in use_cases_lower):
+                matching.append(self._node_list[i])
+            elif keyword_lower in self._purpose_texts[i]:
+                matching.append(self._node_list[i])
         
         return matching
     
+    def get_by_use_cases(self, keywords: Iterable[str]) -> Dict[str, List[NodeCapability]]:
+        """
+        Run get_by_use_case for several keywords with one regex scan per text.
+        
+        Returns:
+            Dict mapping each keyword to its matching nodes (catalog order)
+        """
+        keywords = list(dict.fromkeys(keywords))
+        by_lower: Dict[str, List[str]] = {}
+        for keyword in keywords:
+            by_lower.setdefault(keyword.lower(), []).append(keyword)
+        
+        results: Dict[str, List[NodeCapability]] = {keyword: [] for keyword in keywords}
+        # The empty keyword is a substring of everything
+        for keyword in by_lower.pop("", ()):
+            results[keyword] = list(self._node_list)
+        if not by_lower:
+            return results
+        
+        # Lookahead alternation reports the longest keyword starting at each
+        # position; shorter keywords contained in it are added back via `contained`.
+        longest_first = sorted(by_lower, key=len, reverse=True)
+        pattern = re.compile(
+            "(?=(?:" + "|".join(
+                f"(?P<k{i}>{re.escape(kw)})" for i, kw in enumerate(longest_first)
+            ) + "))"
+        )
+        contained = {
+            f"k{i}": [k for k in longest_first if k in kw]
+            for i, kw in enumerate(longest_first)
+        }
+        
+        for i, node in enumerate(self._node_list):
+            hits = set()
+            for text in (*self._node_use_case_texts[i], self._purpose_texts[i]):
+                for match in pattern.finditer(text):
+                    hits.update(contained[match.lastgroup])
+            for keyword_lower in hits:
+                for keyword in by_lower[keyword_lower]:
+                    results[keyword].append(node)
+        
+        return results
+    
+    def _score_request(self, request_words: Tuple[str, ...]) -> np.ndarray:
+        """Score every catalog node against lowercased request words (aligned with self._node_list)."""
+        purpose_any = np.zeros(len(self._purpose_texts), dtype=bool)
+        use_case_any = np.zeros(len(self._use_case_texts), dtype=bool)
+        for word in set(request_words):
+            purpose_hits, use_case_hits = self._word_hits(word)
+            purpose_any |= purpose_hits
+            use_case_any |= use_case_hits
+        
+        # Categories are single words, so matching against the re-joined words is exact
+        request_lower = " ".join(request_words)
+        category_hits = np.array([c in request_lower for c in self._categories], dtype=np.int32)
+        
+        # Purpose match (+2), one point per matching use case, category mention (+1)
+        return (
+            2 * purpose_any.astype(np.int32)
+            + self._use_case_owner @ use_case_any.astype(np.int32)
+            + category_hits[self._category_index]
+        )
+    
+    def _rank_request(self, request_words: Tuple[str, ...], k: int) -> Tuple[int, ...]:
+        """Indices of the k best-scoring nodes for the lowercased request words."""
+        scores = self._score_request(request_words)
+        candidates = np.flatnonzero(scores > 0).tolist()
+        # nlargest is stable, so catalog order is kept among ties
+        return tuple(heapq.nlargest(k, candidates, key=scores.__getitem__))
+    
+    def find_top_k_for_request(self, request: str, k: int) -> List[NodeCapability]:
+        """Find the k best-scoring nodes for a user request (O(N log k) selection)."""
+        # Lowercase and split once; the word tuple doubles as the cache key
+        request_words = tuple(request.lower().split())
+        return [self._node_list[i] for i in self._ranked_cached(request_words, k)]
+    
     def find_best_nodes_for_request(self, request: str) -> List[NodeCapability]:
         """Find the best nodes for a user request."""
-        request_lower = request.lower()
-        scored_nodes = []
-        
-        for node in self.nodes.values():
-            score = 0
-            
-            # Check purpose
-            if any(word in node.purpose.lower() for word in request_lower.split()):
-                score += 2
-            
-            # Check use cases
-            for use_case in node.use_cases:
-                if any(word in use_case.lower() for word in request_lower.split()):
-                    score += 1
-            
-            # Check category
-            if node.category in request_lower:
-                score += 1
-            
-            if score > 0:
-                scored_nodes.append((score, node))
-        
-        # Sort by score
-        scored_nodes.sort(reverse=True, key=lambda x: x[0])
-        
-        return [node for score, node in scored_nodes[:10]]
+        return self.find_top_k_for_request(request, 10)
     
-    def get_common_patterns(self) -> Dict[str, List[str]]:
+    def get_common_patterns(self) -> Dict[str, Tuple[Tuple[str, ...], ...]]:
         """Get common node combination patterns."""
         patterns = {}
         
@@ -510,25 +645,25 @@ return items.map(item => ({
         return patterns
     
     def to_json(self) -> str:
-        """Convert catalog to JSON."""
-        catalog_dict = {
-            name: node.to_dict()
-            for name, node in self.nodes.items()
-        }
-        return json.dumps(catalog_dict, indent=2)
+        """Convert catalog to JSON (computed once; the catalog is immutable)."""
+        if self._json_cache is None:
+            catalog_dict = {
+                name: node.to_dict()
+                for name, node in self.nodes.items()
+            }
+            if orjson is not None:
+                self._json_cache = orjson.dumps(catalog_dict, option=orjson.OPT_INDENT_2).decode()
+            else:
+                self._json_cache = json.dumps(catalog_dict, indent=2)
+        return self._json_cache
     
     def get_all_categories(self) -> List[str]:
         """Get all unique categories."""
-        return list(set(node.category for node in self.nodes.values()))
-
+        return list(self._all_categories)
 
-# Global instance
-_catalog_instance = None
 
+@lru_cache()
 def get_node_catalog() -> NodeCatalog:
     """Get singleton instance of node catalog."""
-    global _catalog_instance
-    if _catalog_instance is None:
-        _catalog_instance = NodeCatalog()
-    return _catalog_instance
+    return NodeCatalog()
 
@@ -3,7 +3,179 @@ Node schema definitions and validation for n8n nodes.
 Based on the flowfix.txt requirements for proper parameter validation.
 """
 
-from typing import Dict, List, Any, Optional
+import sys
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, NamedTuple, Optional, Tuple
+
+
+# Node schemas with required/optional parameters (read-only, shared by all validators)
+_SCHEMAS: Mapping[str, Dict[str, Any]] = MappingProxyType({
+    "n8n-nodes-base.httpRequest": {
+        "required": ["method", "url"],
+        "optional": ["authentication", "options", "bodyParametersJson", "headerParametersJson"],
+        "requires_credentials": False,
+        "error_handling_recommended": True,
+        "typical_config": {
+            "method": "GET",
+            "url": "https://api.example.com/endpoint",
+            "options": {}
+        }
+    },
+    "@blotato/n8n-nodes-blotato.blotato": {
+        "required": ["resource"],
+        "optional": ["operation", "mediaUrl", "caption", "platform"],
+        "requires_credentials": True,
+        "credential_type": "blotatoApi",
+        "error_handling_recommended": True,
+        "typical_config": {
+            "resource": "post",
+            "operation": "create"
+        }
+    },
+    "n8n-nodes-base.openAi": {
+        "required": ["resource", "operation"],
+        "optional": ["options", "prompt", "model"],
+        "requires_credentials": True,
+        "credential_type": "openAiApi",
+        "typical_config": {
+            "resource": "text",
+            "operation": "complete",
+            "options": {
+                "model": "gpt-4",
+                "temperature": 0.7
+            }
+        }
+    },
+    "@n8n/n8n-nodes-langchain.agent": {
+        "required": ["promptType"],
+        "optional": ["text", "options"],
+        "requires_credentials": False,
+        "error_handling_recommended": False
+    },
+    "@n8n/n8n-nodes-langchain.chatOpenAi": {
+        "required": [],
+        "optional": ["model", "temperature", "maxTokens"],
+        "requires_credentials": True,
+        "credential_type": "openAiApi"
+    },
+    "n8n-nodes-base.if": {
+        "required": ["conditions"],
+        "optional": ["options"],
+        "requires_credentials": False
+    },
+    "n8n-nodes-base.switch": {
+        "required": ["mode"],
+        "optional": ["rules", "output"],
+        "requires_credentials": False
+    },
+    "n8n-nodes-base.merge": {
+        "required": [],
+        "optional": ["mode", "options"],
+        "requires_credentials": False
+    },
+    "n8n-nodes-base.set": {
+        "required": [],
+        "optional": ["values", "options"],
+        "requires_credentials": False
+    },
+    "n8n-nodes-base.code": {
+        "required": ["mode"],
+        "optional": ["jsCode", "pythonCode"],
+        "requires_credentials": False
+    },
+    "n8n-nodes-base.function": {
+        "required": ["functionCode"],
+        "optional": [],
+        "requires_credentials": False
+    },
+    "n8n-nodes-base.googleSheets": {
+        "required": ["resource", "operation"],
+        "optional": ["sheetId", "range", "documentId"],
+        "requires_credentials": True,
+        "credential_type": "googleSheetsOAuth2Api",
+        "error_handling_recommended": True
+    },
+    "n8n-nodes-base.gmail": {
+        "required": ["resource", "operation"],
+        "optional": ["sendTo", "subject", "message"],
+        "requires_credentials": True,
+        "credential_type": "gmailOAuth2",
+        "error_handling_recommended": True
+    },
+    "n8n-nodes-base.slack": {
+        "required": ["resource", "operation"],
+        "optional": ["channel", "text", "username"],
+        "requires_credentials": True,
+        "credential_type": "slackApi",
+        "error_handling_recommended": True
+    },
+    "n8n-nodes-base.postgres": {
+        "required": ["operation"],
+        "optional": ["table", "query", "columns"],
+        "requires_credentials": True,
+        "credential_type": "postgres",
+        "error_handling_recommended": True
+    },
+    "n8n-nodes-base.mysql": {
+        "required": ["operation"],
+        "optional": ["table", "query", "columns"],
+        "requires_credentials": True,
+        "credential_type": "mySql",
+        "error_handling_recommended": True
+    },
+    "n8n-nodes-base.webhook": {
+        "required": [],
+        "optional": ["path", "httpMethod", "responseMode"],
+        "requires_credentials": False
+    },
+    "n8n-nodes-base.scheduleTrigger": {
+        "required": [],
+        "optional": ["rule", "triggerTimes"],
+        "requires_credentials": False
+    },
+    "n8n-nodes-base.manualTrigger": {
+        "required": [],
+        "optional": [],
+        "requires_credentials": False
+    },
+    "n8n-nodes-base.stickyNote": {
+        "required": [],
+        "optional": ["content", "height", "width"],
+        "requires_credentials": False
+    },
+    "n8n-nodes-base.wait": {
+        "required": ["resume"],
+        "optional": ["amount", "unit"],
+        "requires_credentials": False
+    },
+    "n8n-nodes-base.errorTrigger": {
+        "required": [],
+        "optional": [],
+        "requires_credentials": False
+    },
+    "@n8n/n8n-nodes-langchain.toolHackerNews": {
+        "required": [],
+        "optional": ["operation", "articleId"],
+        "requires_credentials": False
+    },
+    "n8n-nodes-base.perplexity": {
+        "required": ["operation"],
+        "optional": ["prompt", "model"],
+        "requires_credentials": True,
+        "credential_type": "perplexityApi"
+    }
+})
+
+
+class _SchemaRules(NamedTuple):
+    """The parts of a schema that validation reads, flattened for fast access."""
+    
+    required: Tuple[str, ...]
+    required_set: frozenset
+    requires_credentials: bool
+    credential_type: Optional[str]
+    error_handling_recommended: bool
 
 
 class NodeSchemaValidator:
@@ -11,165 +183,27 @@ class NodeSchemaValidator:
     
     def __init__(self):
         self.schemas = self._load_schemas()
+        self._rules = self._build_rules(self.schemas)
     
-    def _load_schemas(self) -> Dict[str, Dict[str, Any]]:
+    def _load_schemas(self) -> Mapping[str, Dict[str, Any]]:
         """Load node schemas with required/optional parameters."""
-        return {
-            "n8n-nodes-base.httpRequest": {
-                "required": ["method", "url"],
-                "optional": ["authentication", "options", "bodyParametersJson", "headerParametersJson"],
-                "requires_credentials": False,
-                "error_handling_recommended": True,
-                "typical_config": {
-                    "method": "GET",
-                    "url": "https://api.example.com/endpoint",
-                    "options": {}
-                }
-            },
-            "@blotato/n8n-nodes-blotato.blotato": {
-                "required": ["resource"],
-                "optional": ["operation", "mediaUrl", "caption", "platform"],
-                "requires_credentials": True,
-                "credential_type": "blotatoApi",
-                "error_handling_recommended": True,
-                "typical_config": {
-                    "resource": "post",
-                    "operation": "create"
-                }
-            },
-            "n8n-nodes-base.openAi": {
-                "required": ["resource", "operation"],
-                "optional": ["options", "prompt", "model"],
-                "requires_credentials": True,
-                "credential_type": "openAiApi",
-                "typical_config": {
-                    "resource": "text",
-                    "operation": "complete",
-                    "options": {
-                        "model": "gpt-4",
-                        "temperature": 0.7
-                    }
-                }
-            },
-            "@n8n/n8n-nodes-langchain.agent": {
-                "required": ["promptType"],
-                "optional": ["text", "options"],
-                "requires_credentials": False,
-                "error_handling_recommended": False
-            },
-            "@n8n/n8n-nodes-langchain.chatOpenAi": {
-                "required": [],
-                "optional": ["model", "temperature", "maxTokens"],
-                "requires_credentials": True,
-                "credential_type": "openAiApi"
-            },
-            "n8n-nodes-base.if": {
-                "required": ["conditions"],
-                "optional": ["options"],
-                "requires_credentials": False
-            },
-            "n8n-nodes-base.switch": {
-                "required": ["mode"],
-                "optional": ["rules", "output"],
-                "requires_credentials": False
-            },
-            "n8n-nodes-base.merge": {
-                "required": [],
-                "optional": ["mode", "options"],
-                "requires_credentials": False
-            },
-            "n8n-nodes-base.set": {
-                "required": [],
-                "optional": ["values", "options"],
-                "requires_credentials": False
-            },
-            "n8n-nodes-base.code": {
-                "required": ["mode"],
-                "optional": ["jsCode", "pythonCode"],
-                "requires_credentials": False
-            },
-            "n8n-nodes-base.function": {
-                "required": ["functionCode"],
-                "optional": [],
-                "requires_credentials": False
-            },
-            "n8n-nodes-base.googleSheets": {
-                "required": ["resource", "operation"],
-                "optional": ["sheetId", "range", "documentId"],
-                "requires_credentials": True,
-                "credential_type": "googleSheetsOAuth2Api",
-                "error_handling_recommended": True
-            },
-            "n8n-nodes-base.gmail": {
-                "required": ["resource", "operation"],
-                "optional": ["sendTo", "subject", "message"],
-                "requires_credentials": True,
-                "credential_type": "gmailOAuth2",
-                "error_handling_recommended": True
-            },
-            "n8n-nodes-base.slack": {
-                "required": ["resource", "operation"],
-                "optional": ["channel", "text", "username"],
-                "requires_credentials": True,
-                "credential_type": "slackApi",
-                "error_handling_recommended": True
-            },
-            "n8n-nodes-base.postgres": {
-                "required": ["operation"],
-                "optional": ["table", "query", "columns"],
-                "requires_credentials": True,
-                "credential_type": "postgres",
-                "error_handling_recommended": True
-            },
-            "n8n-nodes-base.mysql": {
-                "required": ["operation"],
-                "optional": ["table", "query", "columns"],
-                "requires_credentials": True,
-                "credential_type": "mySql",
-                "error_handling_recommended": True
-            },
-            "n8n-nodes-base.webhook": {
-                "required": [],
-                "optional": ["path", "httpMethod", "responseMode"],
-                "requires_credentials": False
-            },
-            "n8n-nodes-base.scheduleTrigger": {
-                "required": [],
-                "optional": ["rule", "triggerTimes"],
-                "requires_credentials": False
-            },
-            "n8n-nodes-base.manualTrigger": {
-                "required": [],
-                "optional": [],
-                "requires_credentials": False
-            },
-            "n8n-nodes-base.stickyNote": {
-                "required": [],
-                "optional": ["content", "height", "width"],
-                "requires_credentials": False
-            },
-            "n8n-nodes-base.wait": {
-                "required": ["resume"],
-                "optional": ["amount", "unit"],
-                "requires_credentials": False
-            },
-            "n8n-nodes-base.errorTrigger": {
-                "required": [],
-                "optional": [],
-                "requires_credentials": False
-            },
-            "@n8n/n8n-nodes-langchain.toolHackerNews": {
-                "required": [],
-                "optional": ["operation", "articleId"],
-                "requires_credentials": False
-            },
-            "n8n-nodes-base.perplexity": {
-                "required": ["operation"],
-                "optional": ["prompt", "model"],
-                "requires_credentials": True,
-                "credential_type": "perplexityApi"
-            }
-        }
+        return _SCHEMAS
+    
+    @staticmethod
+    def _build_rules(schemas: Mapping[str, Dict[str, Any]]) -> Dict[str, _SchemaRules]:
+        """Precompute per-type validation rules so lookups are a single dict access."""
+        rules = {}
+        for node_type, schema in schemas.items():
+            required = tuple(schema.get('required', ()))
+            credential_type = schema.get('credential_type')
+            rules[sys.intern(node_type)] = _SchemaRules(
+                required=required,
+                required_set=frozenset(required),
+                requires_credentials=schema.get('requires_credentials', False),
+                credential_type=sys.intern(credential_type) if credential_type else None,
+                error_handling_recommended=schema.get('error_handling_recommended', False)
+            )
+        return rules
     
     def validate_node(self, node: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -182,48 +216,56 @@ class NodeSchemaValidator:
                 - warnings: List[str]
         """
         node_type = node.get('type')
-        schema = self.schemas.get(node_type)
+        rules = self._rules.get(node_type)
         
-        if not schema:
+        if rules is None:
             return {
                 'valid': True,
                 'warnings': [f"No schema found for node type: {node_type}"],
                 'errors': []
             }
         
+        required, required_set, requires_credentials, cred_type, needs_error_handling = rules
         errors = []
         warnings = []
         
         # Check required parameters
-        params = node.get('parameters', {})
-        for req_param in schema.get('required', []):
-            if req_param not in params:
-                errors.append(f"Missing required parameter: {req_param}")
+        # 'or': LLM output sometimes carries "parameters": null
+        params = node.get('parameters') or {}
+        missing = required_set.difference(params)
+        if missing:
+            # Report in schema order so messages are stable across runs
+            errors.extend(
+                f"Missing required parameter: {req_param}"
+                for req_param in required if req_param in missing
+            )
         
         # Check if parameters is empty when it shouldn't be
-        if schema.get('required') and not params:
+        if required and not params:
             errors.append("Parameters object is empty but required parameters are needed")
         
         # Check credentials
-        if schema.get('requires_credentials'):
+        if requires_credentials:
             if 'credentials' not in node:
                 errors.append("Missing credentials configuration")
-            else:
-                cred_type = schema.get('credential_type')
-                if cred_type and cred_type not in node['credentials']:
-                    errors.append(f"Missing credential type: {cred_type}")
+            elif cred_type and cred_type not in node['credentials']:
+                errors.append(f"Missing credential type: {cred_type}")
         
         # Check error handling recommendation
-        if schema.get('error_handling_recommended'):
+        if needs_error_handling:
             if 'onError' not in node and 'retryOnFail' not in node:
                 warnings.append("Error handling recommended but not configured")
         
         return {
-            'valid': len(errors) == 0,
+            'valid': not errors,
             'errors': errors,
             'warnings': warnings
         }
     
+    def get_node_types(self) -> List[str]:
+        """Get all node types that have a schema."""
+        return list(self._rules)
+    
     def get_typical_config(self, node_type: str) -> Dict[str, Any]:
         """Get typical configuration for a node type."""
         schema = self.schemas.get(node_type, {})
@@ -231,29 +273,23 @@ class NodeSchemaValidator:
     
     def requires_credentials(self, node_type: str) -> bool:
         """Check if a node type requires credentials."""
-        schema = self.schemas.get(node_type, {})
-        return schema.get('requires_credentials', False)
+        rules = self._rules.get(node_type)
+        return rules.requires_credentials if rules else False
     
     def get_credential_type(self, node_type: str) -> Optional[str]:
         """Get the credential type for a node."""
-        schema = self.schemas.get(node_type, {})
-        return schema.get('credential_type')
+        rules = self._rules.get(node_type)
+        return rules.credential_type if rules else None
     
     def needs_error_handling(self, node_type: str) -> bool:
         """Check if a node type should have error handling."""
-        schema = self.schemas.get(node_type, {})
-        return schema.get('error_handling_recommended', False)
-
-
-# Global instance
-_validator_instance = None
+        rules = self._rules.get(node_type)
+        return rules.error_handling_recommended if rules else False
 
 
+@lru_cache()
 def get_node_schema_validator() -> NodeSchemaValidator:
     """Get singleton instance of node schema validator."""
-    global _validator_instance
-    if _validator_instance is None:
-        _validator_instance = NodeSchemaValidator()
-    return _validator_instance
+    return NodeSchemaValidator()
 
 
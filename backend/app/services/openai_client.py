@@ -0,0 +1,65 @@
+"""
+Process-wide OpenAI client.
+Shares one HTTP connection pool (keep-alive, HTTP/2) across all services.
+"""
+
+import threading
+import time
+
+import httpx
+from openai import OpenAI
+from ..config import get_settings
+
+
+# Idle pooled connections are kept this long; warming is skipped within the window
+KEEPALIVE_EXPIRY_SECONDS = 30.0
+
+# Global instance
+_openai_client = None
+_last_warmed = 0.0
+_warm_lock = threading.Lock()
+
+
+def get_openai_client() -> OpenAI:
+    """Get singleton OpenAI client backed by a pooled HTTP/2 httpx client."""
+    global _openai_client
+    if _openai_client is None:
+        settings = get_settings()
+        _openai_client = OpenAI(
+            api_key=settings.openai_api_key,
+            http_client=httpx.Client(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS
+                ),
+                timeout=httpx.Timeout(600.0, connect=5.0)
+            )
+        )
+    return _openai_client
+
+
+def warm_openai_connection() -> None:
+    """
+    Open (or refresh) a pooled connection to the OpenAI API in the background.
+    
+    Called before prompt retrieval so DNS/TCP/TLS setup overlaps with retrieval
+    work instead of sitting on the critical path of the completion request.
+    No-op if a connection was warmed within the keep-alive window.
+    """
+    global _last_warmed
+    with _warm_lock:
+        now = time.monotonic()
+        if now - _last_warmed < KEEPALIVE_EXPIRY_SECONDS:
+            return
+        _last_warmed = now
+    
+    def _warm():
+        try:
+            # Cheap authenticated GET; no tokens are consumed
+            get_openai_client().models.retrieve(get_settings().openai_model)
+        except Exception as e:
+            print(f"Warning: Could not warm OpenAI connection: {e}")
+    
+    threading.Thread(target=_warm, daemon=True).start()
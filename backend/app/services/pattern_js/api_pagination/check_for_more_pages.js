@@ -0,0 +1,15 @@
+const response = $input.item.json;
+const prevData = $input.all()[0].json;
+
+// Accumulate results
+const allResults = [...(prevData.allResults || []), ...response.data];
+
+// Check if there are more pages
+const hasMore = response.data.length > 0 && response.hasNextPage !== false;
+
+return {
+  page: prevData.page + 1,
+  hasMore: hasMore,
+  allResults: allResults,
+  totalFetched: allResults.length
+};
@@ -0,0 +1,5 @@
+return {
+  page: 1,
+  hasMore: true,
+  allResults: []
+};
@@ -0,0 +1,10 @@
+return {
+  workflow_id: $workflow.id,
+  workflow_name: $workflow.name,
+  execution_id: $execution.id,
+  execution_mode: $execution.mode,
+  timestamp: new Date().toISOString(),
+  data: $input.item.json,
+  node_name: $node.name,
+  success: true
+};
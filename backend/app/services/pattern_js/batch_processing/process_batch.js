@@ -0,0 +1,12 @@
+// Process current batch
+const items = $input.all();
+const processedItems = items.map(item => {
+  // Your processing logic here
+  return {
+    ...item.json,
+    processed: true,
+    processed_at: new Date().toISOString()
+  };
+});
+
+return processedItems;
@@ -0,0 +1,7 @@
+console.error('Validation failed:', $json.validation.errors);
+return {
+  error_type: 'validation_failed',
+  data: $json,
+  errors: $json.validation.errors,
+  timestamp: new Date().toISOString()
+};
@@ -0,0 +1,30 @@
+// Validate incoming data
+const item = $input.item.json;
+const errors = [];
+
+// Required fields check
+const requiredFields = ['email', 'name'];
+for (const field of requiredFields) {
+  if (!item[field] || item[field].trim() === '') {
+    errors.push(`Missing required field: ${field}`);
+  }
+}
+
+// Email validation
+if (item.email && !/^[^\s@]+@[^\s@]+\.[^\s@]+$/.test(item.email)) {
+  errors.push('Invalid email format');
+}
+
+// Phone validation (if provided)
+if (item.phone && !/^[\d\s\-\+\(\)]+$/.test(item.phone)) {
+  errors.push('Invalid phone format');
+}
+
+return {
+  ...item,
+  validation: {
+    is_valid: errors.length === 0,
+    errors: errors,
+    validated_at: new Date().toISOString()
+  }
+};
@@ -0,0 +1,6 @@
+const data = $input.item.json;
+return {
+  subject: `Urgent: ${data.subject}`,
+  body: `Dear ${data.name},\n\nThis is a high-priority matter...`,
+  ...data
+};
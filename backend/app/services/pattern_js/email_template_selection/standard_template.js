@@ -0,0 +1,6 @@
+const data = $input.item.json;
+return {
+  subject: `Hello ${data.name}`,
+  body: `Hi ${data.name},\n\nThank you for your interest...`,
+  ...data
+};
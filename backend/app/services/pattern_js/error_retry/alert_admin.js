@@ -0,0 +1,7 @@
+return {
+  alert_type: 'max_retries_exceeded',
+  workflow_id: $workflow.id,
+  execution_id: $execution.id,
+  error_details: $json,
+  timestamp: new Date().toISOString()
+};
@@ -0,0 +1,24 @@
+// Exponential backoff retry logic
+const error = $input.item.json;
+const retryCount = error.retryCount || 0;
+const maxRetries = 3;
+
+if (retryCount >= maxRetries) {
+  return {
+    ...error,
+    retryCount: retryCount,
+    status: 'max_retries_exceeded',
+    message: 'Failed after maximum retries'
+  };
+}
+
+// Calculate backoff delay (exponential)
+const backoffMs = Math.pow(2, retryCount) * 1000;
+
+return {
+  ...error,
+  retryCount: retryCount + 1,
+  nextRetryDelay: backoffMs,
+  shouldRetry: true,
+  retryAt: new Date(Date.now() + backoffMs).toISOString()
+};
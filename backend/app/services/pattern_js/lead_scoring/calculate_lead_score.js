@@ -0,0 +1,41 @@
+// Lead scoring algorithm
+const lead = $input.item.json;
+let score = 0;
+
+// Company size scoring
+if (lead.company_size) {
+  if (lead.company_size > 1000) score += 40;
+  else if (lead.company_size > 100) score += 30;
+  else if (lead.company_size > 10) score += 20;
+  else score += 10;
+}
+
+// Budget scoring
+if (lead.budget) {
+  if (lead.budget > 100000) score += 30;
+  else if (lead.budget > 10000) score += 20;
+  else if (lead.budget > 1000) score += 10;
+}
+
+// Industry scoring
+const highValueIndustries = ['technology', 'finance', 'healthcare'];
+if (highValueIndustries.includes(lead.industry?.toLowerCase())) {
+  score += 15;
+}
+
+// Engagement scoring
+if (lead.visited_pricing_page) score += 10;
+if (lead.downloaded_whitepaper) score += 5;
+if (lead.requested_demo) score += 20;
+
+// Determine priority level
+let priority = 'low';
+if (score >= 80) priority = 'high';
+else if (score >= 50) priority = 'medium';
+
+return {
+  ...lead,
+  score: score,
+  priority: priority,
+  scored_at: new Date().toISOString()
+};
@@ -0,0 +1,18 @@
+// Extract API key from headers
+const providedKey = $input.item.json.headers?.['x-api-key'] || 
+                     $input.item.json.headers?.['authorization']?.replace('Bearer ', '');
+
+// Validate against stored keys (use environment variable in production)
+const validKeys = (process.env.VALID_API_KEYS || '').split(',');
+
+const isValid = validKeys.includes(providedKey);
+
+if (!isValid) {
+  throw new Error('Invalid API key');
+}
+
+return {
+  ...$input.item.json,
+  authenticated: true,
+  api_key_valid: true
+};
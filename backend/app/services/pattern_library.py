@@ -3,36 +3,86 @@ Pattern Library for common n8n workflow patterns.
 Reusable workflow patterns that can be composed into complex workflows.
 """
 
-from typing import Dict, List, Any, Optional
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional, Tuple
 from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+import heapq
+import json
+import sys
 import uuid
 
+import numpy as np
 
-@dataclass
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# JavaScript bodies for the patterns' function nodes live in pattern_js/
+_PATTERN_JS_DIR = Path(__file__).parent / "pattern_js"
+
+
+@lru_cache(maxsize=None)
+def _load_js(relative_path: str) -> str:
+    """Read a function node's JavaScript source from pattern_js/."""
+    return (_PATTERN_JS_DIR / relative_path).read_text(encoding="utf-8").rstrip("\n")
+
+
+@dataclass(frozen=True, slots=True)
 class WorkflowPattern:
     """Represents a reusable workflow pattern."""
     
     name: str
     description: str
     complexity_score: int
-    when_to_use: List[str]
+    when_to_use: Tuple[str, ...]
     nodes: List[Dict[str, Any]]
     connections: Dict[str, Any]
-    required_inputs: List[str] = field(default_factory=list)
-    provides_outputs: List[str] = field(default_factory=list)
+    required_inputs: Tuple[str, ...] = field(default_factory=tuple)
+    provides_outputs: Tuple[str, ...] = field(default_factory=tuple)
+    
+    # Patterns are constants, so their serialized forms are built once
+    _dict_cache: Optional[Mapping[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _json_cache: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Call sites pass list literals; store the read-only sequences as tuples
+        object.__setattr__(self, 'when_to_use', tuple(self.when_to_use))
+        object.__setattr__(self, 'required_inputs', tuple(self.required_inputs))
+        object.__setattr__(self, 'provides_outputs', tuple(self.provides_outputs))
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
-        return {
-            "name": self.name,
-            "description": self.description,
-            "complexity_score": self.complexity_score,
-            "when_to_use": self.when_to_use,
-            "nodes": self.nodes,
-            "connections": self.connections,
-            "required_inputs": self.required_inputs,
-            "provides_outputs": self.provides_outputs
-        }
+        return dict(self.as_mapping())
+    
+    def as_mapping(self) -> Mapping[str, Any]:
+        """Read-only view of to_dict() (cached; no copy per call)."""
+        if self._dict_cache is None:
+            object.__setattr__(self, '_dict_cache', MappingProxyType({
+                "name": self.name,
+                "description": self.description,
+                "complexity_score": self.complexity_score,
+                "when_to_use": self.when_to_use,
+                "nodes": self.nodes,
+                "connections": self.connections,
+                "required_inputs": self.required_inputs,
+                "provides_outputs": self.provides_outputs
+            }))
+        return self._dict_cache
+    
+    def to_json_bytes(self) -> bytes:
+        """Serialize to UTF-8 JSON (cached)."""
+        if self._json_cache is None:
+            data = self.to_dict()
+            if orjson is not None:
+                encoded = orjson.dumps(data)
+            else:
+                encoded = json.dumps(data, separators=(',', ':')).encode('utf-8')
+            object.__setattr__(self, '_json_cache', encoded)
+        return self._json_cache
 
 
 class PatternLibrary:
@@ -40,6 +90,53 @@ class PatternLibrary:
     
     def __init__(self):
         self.patterns = self._build_patterns()
+        self._intern_node_types()
+        self._build_scoring_index()
+    
+    def _intern_node_types(self):
+        """Intern node type strings so they are shared with the node catalog's keys."""
+        for pattern in self.patterns.values():
+            for node in pattern.nodes:
+                node["type"] = sys.intern(node["type"])
+    
+    def _build_scoring_index(self):
+        """
+        Precompute arrays used to score all patterns against a request at once.
+        
+        A (patterns x when_to_use entries) ownership matrix turns per-entry hits
+        into per-pattern counts with one matmul.
+        """
+        self._pattern_list = list(self.patterns.values())
+        self._description_texts = [p.description.lower() for p in self._pattern_list]
+        self._when_to_use_texts = [w.lower() for p in self._pattern_list for w in p.when_to_use]
+        
+        self._when_to_use_owner = np.zeros(
+            (len(self._pattern_list), len(self._when_to_use_texts)),
+            dtype=np.int32
+        )
+        column = 0
+        for row, pattern in enumerate(self._pattern_list):
+            for _ in pattern.when_to_use:
+                self._when_to_use_owner[row, column] = 1
+                column += 1
+        
+        # Memoized per-word hit vectors and request scores (library is immutable at runtime)
+        self._word_hits = lru_cache(maxsize=4096)(self._compute_word_hits)
+        self._scores_cached = lru_cache(maxsize=1024)(self._score_words)
+    
+    def _compute_word_hits(self, word: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Boolean vectors marking descriptions and when_to_use entries that contain word."""
+        description_hits = np.fromiter(
+            (word in text for text in self._description_texts),
+            dtype=bool,
+            count=len(self._description_texts)
+        )
+        when_to_use_hits = np.fromiter(
+            (word in text for text in self._when_to_use_texts),
+            dtype=bool,
+            count=len(self._when_to_use_texts)
+        )
+        return description_hits, when_to_use_hits
     
     def _build_patterns(self) -> Dict[str, WorkflowPattern]:
         """Build library of workflow patterns."""
@@ -63,36 +160,7 @@ class PatternLibrary:
                     "name": "Validate Data",
                     "type": "n8n-nodes-base.function",
                     "parameters": {
-                        "functionCode": """// Validate incoming data
-const item = $input.item.json;
-const errors = [];
-
-// Required fields check
-const requiredFields = ['email', 'name'];
-for (const field of requiredFields) {
-  if (!item[field] || item[field].trim() === '') {
-    errors.push(`Missing required field: ${field}`);
-  }
-}
-
-// Email validation
-if (item.email && !/^[^\\s@]+@[^\\s@]+\\.[^\\s@]+$/.test(item.email)) {
-  errors.push('Invalid email format');
-}
-
-// Phone validation (if provided)
-if (item.phone && !/^[\\d\\s\\-\\+\\(\\)]+$/.test(item.phone)) {
-  errors.push('Invalid phone format');
-}
-
-return {
-  ...item,
-  validation: {
-    is_valid: errors.length === 0,
-    errors: errors,
-    validated_at: new Date().toISOString()
-  }
-};"""
+                        "functionCode": _load_js("data_validation/validate_data.js")
                     }
                 },
                 {
@@ -111,13 +179,7 @@ return {
                     "name": "Log Validation Error",
                     "type": "n8n-nodes-base.function",
                     "parameters": {
-                        "functionCode": """console.error('Validation failed:', $json.validation.errors);
-return {
-  error_type: 'validation_failed',
-  data: $json,
-  errors: $json.validation.errors,
-  timestamp: new Date().toISOString()
-};"""
+                        "functionCode": _load_js("data_validation/log_validation_error.js")
                     }
                 }
             ],
@@ -184,47 +246,7 @@ return {
                     "name": "Calculate Lead Score",
                     "type": "n8n-nodes-base.function",
                     "parameters": {
-                        "functionCode": """// Lead scoring algorithm
-const lead = $input.item.json;
-let score = 0;
-
-// Company size scoring
-if (lead.company_size) {
-  if (lead.company_size > 1000) score += 40;
-  else if (lead.company_size > 100) score += 30;
-  else if (lead.company_size > 10) score += 20;
-  else score += 10;
-}
-
-// Budget scoring
-if (lead.budget) {
-  if (lead.budget > 100000) score += 30;
-  else if (lead.budget > 10000) score += 20;
-  else if (lead.budget > 1000) score += 10;
-}
-
-// Industry scoring
-const highValueIndustries = ['technology', 'finance', 'healthcare'];
-if (highValueIndustries.includes(lead.industry?.toLowerCase())) {
-  score += 15;
-}
-
-// Engagement scoring
-if (lead.visited_pricing_page) score += 10;
-if (lead.downloaded_whitepaper) score += 5;
-if (lead.requested_demo) score += 20;
-
-// Determine priority level
-let priority = 'low';
-if (score >= 80) priority = 'high';
-else if (score >= 50) priority = 'medium';
-
-return {
-  ...lead,
-  score: score,
-  priority: priority,
-  scored_at: new Date().toISOString()
-};"""
+                        "functionCode": _load_js("lead_scoring/calculate_lead_score.js")
                     }
                 }
             ],
@@ -332,30 +354,7 @@ return {
                     "name": "Retry Logic",
                     "type": "n8n-nodes-base.function",
                     "parameters": {
-                        "functionCode": """// Exponential backoff retry logic
-const error = $input.item.json;
-const retryCount = error.retryCount || 0;
-const maxRetries = 3;
-
-if (retryCount >= maxRetries) {
-  return {
-    ...error,
-    retryCount: retryCount,
-    status: 'max_retries_exceeded',
-    message: 'Failed after maximum retries'
-  };
-}
-
-// Calculate backoff delay (exponential)
-const backoffMs = Math.pow(2, retryCount) * 1000;
-
-return {
-  ...error,
-  retryCount: retryCount + 1,
-  nextRetryDelay: backoffMs,
-  shouldRetry: true,
-  retryAt: new Date(Date.now() + backoffMs).toISOString()
-};"""
+                        "functionCode": _load_js("error_retry/retry_logic.js")
                     }
                 },
                 {
@@ -382,13 +381,7 @@ return {
                     "name": "Alert Admin",
                     "type": "n8n-nodes-base.function",
                     "parameters": {
-                        "functionCode": """return {
-  alert_type: 'max_retries_exceeded',
-  workflow_id: $workflow.id,
-  execution_id: $execution.id,
-  error_details: $json,
-  timestamp: new Date().toISOString()
-};"""
+                        "functionCode": _load_js("error_retry/alert_admin.js")
                     }
                 }
             ],
@@ -423,18 +416,7 @@ return {
                     "name": "Process Batch",
                     "type": "n8n-nodes-base.function",
                     "parameters": {
-                        "functionCode": """// Process current batch
-const items = $input.all();
-const processedItems = items.map(item => {
-  // Your processing logic here
-  return {
-    ...item.json,
-    processed: true,
-    processed_at: new Date().toISOString()
-  };
-});
-
-return processedItems;"""
+                        "functionCode": _load_js("batch_processing/process_batch.js")
                     }
                 },
                 {
@@ -466,11 +448,7 @@ return processedItems;"""
                     "name": "Initialize Pagination",
                     "type": "n8n-nodes-base.function",
                     "parameters": {
-                        "functionCode": """return {
-  page: 1,
-  hasMore: true,
-  allResults: []
-};"""
+                        "functionCode": _load_js("api_pagination/initialize_pagination.js")
                     }
                 },
                 {
@@ -486,21 +464,7 @@ return processedItems;"""
                     "name": "Check for More Pages",
                     "type": "n8n-nodes-base.function",
                     "parameters": {
-                        "functionCode": """const response = $input.item.json;
-const prevData = $input.all()[0].json;
-
-// Accumulate results
-const allResults = [...(prevData.allResults || []), ...response.data];
-
-// Check if there are more pages
-const hasMore = response.data.length > 0 && response.hasNextPage !== false;
-
-return {
-  page: prevData.page + 1,
-  hasMore: hasMore,
-  allResults: allResults,
-  totalFetched: allResults.length
-};"""
+                        "functionCode": _load_js("api_pagination/check_for_more_pages.js")
                     }
                 },
                 {
@@ -545,24 +509,14 @@ return {
                     "name": "High Priority Template",
                     "type": "n8n-nodes-base.function",
                     "parameters": {
-                        "functionCode": """const data = $input.item.json;
-return {
-  subject: `Urgent: ${data.subject}`,
-  body: `Dear ${data.name},\\n\\nThis is a high-priority matter...`,
-  ...data
-};"""
+                        "functionCode": _load_js("email_template_selection/high_priority_template.js")
                     }
                 },
                 {
                     "name": "Standard Template",
                     "type": "n8n-nodes-base.function",
                     "parameters": {
-                        "functionCode": """const data = $input.item.json;
-return {
-  subject: `Hello ${data.name}`,
-  body: `Hi ${data.name},\\n\\nThank you for your interest...`,
-  ...data
-};"""
+                        "functionCode": _load_js("email_template_selection/standard_template.js")
                     }
                 }
             ],
@@ -586,24 +540,7 @@ return {
                     "name": "Validate API Key",
                     "type": "n8n-nodes-base.function",
                     "parameters": {
-                        "functionCode": """// Extract API key from headers
-const providedKey = $input.item.json.headers?.['x-api-key'] || 
-                     $input.item.json.headers?.['authorization']?.replace('Bearer ', '');
-
-// Validate against stored keys (use environment variable in production)
-const validKeys = (process.env.VALID_API_KEYS || '').split(',');
-
-const isValid = validKeys.includes(providedKey);
-
-if (!isValid) {
-  throw new Error('Invalid API key');
-}
-
-return {
-  ...$input.item.json,
-  authenticated: true,
-  api_key_valid: true
-};"""
+                        "functionCode": _load_js("webhook_auth/validate_api_key.js")
                     }
                 }
             ],
@@ -628,16 +565,7 @@ return {
                     "name": "Create Log Entry",
                     "type": "n8n-nodes-base.function",
                     "parameters": {
-                        "functionCode": """return {
-  workflow_id: $workflow.id,
-  workflow_name: $workflow.name,
-  execution_id: $execution.id,
-  execution_mode: $execution.mode,
-  timestamp: new Date().toISOString(),
-  data: $input.item.json,
-  node_name: $node.name,
-  success: true
-};"""
+                        "functionCode": _load_js("audit_logging/create_log_entry.js")
                     }
                 },
                 {
@@ -658,43 +586,60 @@ return {
         """Get a specific pattern by name."""
         return self.patterns.get(pattern_name)
     
+    def _score_request(self, request: str) -> np.ndarray:
+        """Score every pattern against a request (aligned with self._pattern_list)."""
+        # Lowercase and split once; the word tuple doubles as the cache key
+        return self._scores_cached(tuple(request.lower().split()))
+    
+    def _score_words(self, request_words: Tuple[str, ...]) -> np.ndarray:
+        """Score every pattern against lowercased request words (result is read-only)."""
+        description_any = np.zeros(len(self._description_texts), dtype=bool)
+        when_to_use_any = np.zeros(len(self._when_to_use_texts), dtype=bool)
+        for word in set(request_words):
+            description_hits, when_to_use_hits = self._word_hits(word)
+            description_any |= description_hits
+            when_to_use_any |= when_to_use_hits
+        
+        # Description match (+2), three points per matching when_to_use entry
+        scores = (
+            2 * description_any.astype(np.int32)
+            + 3 * (self._when_to_use_owner @ when_to_use_any.astype(np.int32))
+        )
+        scores.setflags(write=False)
+        return scores
+    
+    def find_top_k_for_request(self, request: str, k: int) -> List[WorkflowPattern]:
+        """Find the k best-scoring patterns for a user request (O(N log k) selection)."""
+        scores = self._score_request(request)
+        candidates = np.flatnonzero(scores > 0).tolist()
+        # nlargest is stable, so library order is kept among ties
+        best = heapq.nlargest(k, candidates, key=scores.__getitem__)
+        return [self._pattern_list[i] for i in best]
+    
     def find_patterns_for_request(self, request: str) -> List[WorkflowPattern]:
         """Find relevant patterns based on user request."""
-        request_lower = request.lower()
-        scored_patterns = []
+        scores = self._score_request(request)
         
-        for pattern in self.patterns.values():
-            score = 0
-            
-            # Check description
-            if any(word in pattern.description.lower() for word in request_lower.split()):
-                score += 2
-            
-            # Check when_to_use
-            for use_case in pattern.when_to_use:
-                if any(word in use_case.lower() for word in request_lower.split()):
-                    score += 3
-            
-            if score > 0:
-                scored_patterns.append((score, pattern))
-        
-        # Sort by score
-        scored_patterns.sort(reverse=True, key=lambda x: x[0])
-        
-        return [pattern for score, pattern in scored_patterns]
+        # Stable descending sort keeps library order among ties
+        order = np.argsort(-scores, kind='stable')
+        return [self._pattern_list[i] for i in order if scores[i] > 0]
     
     def get_all_patterns(self) -> List[WorkflowPattern]:
         """Get all patterns."""
         return list(self.patterns.values())
+    
+    @cached_property
+    def _all_patterns_json(self) -> bytes:
+        """JSON array of every pattern, stitched from the per-pattern cached blobs."""
+        return b"[" + b",".join(p.to_json_bytes() for p in self.patterns.values()) + b"]"
+    
+    def get_all_patterns_json(self) -> bytes:
+        """Get all patterns as a UTF-8 JSON array (encoded once, ready for a Response body)."""
+        return self._all_patterns_json
 
 
-# Global instance
-_library_instance = None
-
+@lru_cache()
 def get_pattern_library() -> PatternLibrary:
     """Get singleton instance of pattern library."""
-    global _library_instance
-    if _library_instance is None:
-        _library_instance = PatternLibrary()
-    return _library_instance
+    return PatternLibrary()
 
@@ -3,15 +3,64 @@ Workflow quality validation system.
 Implements comprehensive quality scoring based on flowfix.txt requirements.
 """
 
-from typing import Dict, List, Any, Optional
+from collections import Counter
+from itertools import chain
+from typing import Dict, List, Any, NamedTuple, Optional, Set
 from .node_schemas import get_node_schema_validator
 
 
+STICKY_NOTE_TYPE = 'n8n-nodes-base.stickyNote'
+
+# Score ladders: (minimum value, points), highest threshold first
+NODE_COUNT_SCORES = ((35, 20), (25, 15), (15, 10), (10, 5))
+CREDENTIAL_SCORES = ((1.0, 15), (0.8, 12), (0.6, 9), (0.4, 6))
+PARAMETER_SCORES = ((1.0, 15), (0.9, 12), (0.8, 9))
+ERROR_HANDLING_SCORES = ((0.5, 20), (0.4, 16), (0.3, 12), (0.2, 8))
+DOCUMENTATION_SCORES = ((8, 10), (5, 7), (3, 4))
+FLOW_FEATURE_SCORES = {
+    # For simple workflows, less complexity is OK
+    'simple': ((2, 15), (1, 10), (0, 5)),
+    # For standard/complex workflows, require more
+    'default': ((3, 15), (2, 10), (1, 5))
+}
+# Maximum score the per-node checks (credentials, parameters, error handling, connections) can add
+DEFERRED_CHECKS_MAX_SCORE = 15 + 15 + 20 + 5
+GRADES = ((90, 'A (Excellent)'), (80, 'B (Good)'), (70, 'C (Acceptable)'), (60, 'D (Needs Improvement)'))
+
+
+def _score_from_ladder(value: float, ladder, default=0):
+    """Return the points for the first threshold that value reaches."""
+    for threshold, points in ladder:
+        if value >= threshold:
+            return points
+    return default
+
+
+class _NodeSummary(NamedTuple):
+    """Per-workflow node facts gathered in one pass and shared by the checks."""
+    
+    node_names: Set[str]
+    trigger_names: Set[str]
+    sticky_names: Set[str]
+    service_nodes: int
+    service_nodes_with_credentials: int
+    parameter_nodes: int
+    parameter_nodes_valid: int
+    processable_nodes: int
+    processable_nodes_with_error_handling: int
+
+
 class QualityValidator:
     """Validates n8n workflow quality against production standards."""
     
     def __init__(self):
         self.node_validator = get_node_schema_validator()
+        # Credential type (possibly None) for every node type that requires credentials
+        self._credential_types = {
+            node_type: self.node_validator.get_credential_type(node_type)
+            for node_type in self.node_validator.get_node_types()
+            if self.node_validator.requires_credentials(node_type)
+        }
         self.min_node_count = {
             'simple': 15,
             'standard': 25,
@@ -21,25 +70,64 @@ class QualityValidator:
         self.min_sticky_notes = 5
         self.min_quality_score = 80
     
-    def validate(self, workflow: Dict[str, Any], complexity: str = 'standard') -> Dict[str, Any]:
+    def validate(
+        self,
+        workflow: Dict[str, Any],
+        complexity: str = 'standard',
+        short_circuit: bool = False
+    ) -> Dict[str, Any]:
         """
         Run comprehensive validation checks on a workflow.
         
         Args:
             workflow: n8n workflow JSON
             complexity: 'simple', 'standard', or 'complex'
+            short_circuit: Skip the per-node checks once the minimum quality
+                score is out of reach; details then only hold the cheap checks
+                and the result carries 'short_circuited': True
         
         Returns:
             Dict with validation results and quality score
         """
+        nodes = workflow.get('nodes', [])
+        type_counts = Counter(node.get('type', '') for node in nodes)
+        
+        # Cheap checks first: they only need the node and type counts
+        node_count = self._check_node_count(len(nodes), complexity)
+        documentation = self._check_documentation(type_counts[STICKY_NOTE_TYPE])
+        flow_complexity = self._check_flow_complexity(type_counts, complexity)
+        
+        if short_circuit:
+            best_possible = (
+                node_count['score'] + documentation['score'] + flow_complexity['score']
+                + DEFERRED_CHECKS_MAX_SCORE
+            )
+            if best_possible < self.min_quality_score:
+                results = {
+                    'node_count': node_count,
+                    'documentation': documentation,
+                    'flow_complexity': flow_complexity
+                }
+                partial_score = self._calculate_score(results)
+                return {
+                    'valid': False,
+                    'score': partial_score,
+                    'details': results,
+                    'required_score': self.min_quality_score,
+                    'grade': self._get_grade(partial_score),
+                    'short_circuited': True
+                }
+        
+        summary = self._summarize_nodes(nodes, type_counts)
+        
         results = {
-            'node_count': self._check_node_count(workflow, complexity),
-            'credentials': self._check_credentials(workflow),
-            'parameters': self._check_parameters(workflow),
-            'error_handling': self._check_error_handling(workflow),
-            'connections': self._check_connections(workflow),
-            'documentation': self._check_documentation(workflow),
-            'flow_complexity': self._check_flow_complexity(workflow, complexity)
+            'node_count': node_count,
+            'credentials': self._check_credentials(summary),
+            'parameters': self._check_parameters(summary),
+            'error_handling': self._check_error_handling(summary),
+            'connections': self._check_connections(workflow, summary),
+            'documentation': documentation,
+            'flow_complexity': flow_complexity
         }
         
         overall_score = self._calculate_score(results)
@@ -52,22 +140,62 @@ class QualityValidator:
             'grade': self._get_grade(overall_score)
         }
     
-    def _check_node_count(self, workflow: Dict[str, Any], complexity: str) -> Dict[str, Any]:
+    def _summarize_nodes(self, nodes: List[Dict[str, Any]], type_counts: Counter) -> _NodeSummary:
+        """Classify every node in a single pass."""
+        node_names = set()
+        trigger_names = set()
+        sticky_names = set()
+        service_nodes = 0
+        service_nodes_with_credentials = 0
+        parameter_nodes_valid = 0
+        processable_nodes = 0
+        processable_nodes_with_error_handling = 0
+        
+        for node in nodes:
+            node_type = node.get('type', '')
+            name = node['name']
+            node_names.add(name)
+            
+            if node_type == STICKY_NOTE_TYPE:
+                sticky_names.add(name)
+                continue
+            
+            # Credentials
+            if node_type in self._credential_types:
+                service_nodes += 1
+                cred_type = self._credential_types[node_type]
+                if cred_type and 'credentials' in node and cred_type in node['credentials']:
+                    service_nodes_with_credentials += 1
+            
+            # Parameters
+            if self.node_validator.validate_node(node)['valid']:
+                parameter_nodes_valid += 1
+            
+            # Error handling (triggers excluded)
+            if node_type.endswith('Trigger'):
+                trigger_names.add(name)
+            else:
+                processable_nodes += 1
+                if 'onError' in node or 'retryOnFail' in node or 'continueOnFail' in node:
+                    processable_nodes_with_error_handling += 1
+        
+        return _NodeSummary(
+            node_names=node_names,
+            trigger_names=trigger_names,
+            sticky_names=sticky_names,
+            service_nodes=service_nodes,
+            service_nodes_with_credentials=service_nodes_with_credentials,
+            parameter_nodes=len(nodes) - type_counts[STICKY_NOTE_TYPE],
+            parameter_nodes_valid=parameter_nodes_valid,
+            processable_nodes=processable_nodes,
+            processable_nodes_with_error_handling=processable_nodes_with_error_handling
+        )
+    
+    def _check_node_count(self, node_count: int, complexity: str) -> Dict[str, Any]:
         """Check if workflow has sufficient nodes (20 points)."""
-        nodes = workflow.get('nodes', [])
-        node_count = len(nodes)
         required = self.min_node_count.get(complexity, 25)
         
-        if node_count >= 35:
-            score = 20
-        elif node_count >= 25:
-            score = 15
-        elif node_count >= 15:
-            score = 10
-        elif node_count >= 10:
-            score = 5
-        else:
-            score = 0
+        score = _score_from_ladder(node_count, NODE_COUNT_SCORES)
         
         return {
             'score': score,
@@ -78,15 +206,9 @@ class QualityValidator:
             'message': f"Node count: {node_count} (required: {required})"
         }
     
-    def _check_credentials(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
+    def _check_credentials(self, summary: _NodeSummary) -> Dict[str, Any]:
         """Check credentials configuration (15 points)."""
-        nodes = workflow.get('nodes', [])
-        
-        # Find service nodes that require credentials
-        service_nodes = []
-        for node in nodes:
-            if self.node_validator.requires_credentials(node.get('type', '')):
-                service_nodes.append(node)
+        service_nodes = summary.service_nodes
         
         if not service_nodes:
             return {
@@ -96,65 +218,32 @@ class QualityValidator:
                 'message': 'No service nodes requiring credentials'
             }
         
-        # Check how many have proper credentials
-        nodes_with_creds = 0
-        for node in service_nodes:
-            if 'credentials' in node:
-                cred_type = self.node_validator.get_credential_type(node.get('type', ''))
-                if cred_type and cred_type in node['credentials']:
-                    nodes_with_creds += 1
-        
-        percentage = nodes_with_creds / len(service_nodes)
-        
-        if percentage >= 1.0:
-            score = 15
-        elif percentage >= 0.8:
-            score = 12
-        elif percentage >= 0.6:
-            score = 9
-        elif percentage >= 0.4:
-            score = 6
-        else:
-            score = 0
+        nodes_with_creds = summary.service_nodes_with_credentials
+        percentage = nodes_with_creds / service_nodes
+        
+        score = _score_from_ladder(percentage, CREDENTIAL_SCORES)
         
         return {
             'score': score,
             'max_score': 15,
-            'service_nodes': len(service_nodes),
+            'service_nodes': service_nodes,
             'with_credentials': nodes_with_creds,
             'percentage': percentage,
             'passed': percentage >= 0.9,
-            'message': f"{nodes_with_creds}/{len(service_nodes)} service nodes have credentials"
+            'message': f"{nodes_with_creds}/{service_nodes} service nodes have credentials"
         }
     
-    def _check_parameters(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
+    def _check_parameters(self, summary: _NodeSummary) -> Dict[str, Any]:
         """Check parameter completeness (15 points)."""
-        nodes = workflow.get('nodes', [])
-        
-        total_nodes = len([n for n in nodes if n.get('type') != 'n8n-nodes-base.stickyNote'])
-        complete_params = 0
-        
-        for node in nodes:
-            if node.get('type') == 'n8n-nodes-base.stickyNote':
-                continue
-                
-            validation = self.node_validator.validate_node(node)
-            if validation['valid']:
-                complete_params += 1
+        total_nodes = summary.parameter_nodes
+        complete_params = summary.parameter_nodes_valid
         
         if total_nodes == 0:
             percentage = 1.0
         else:
             percentage = complete_params / total_nodes
         
-        if percentage >= 1.0:
-            score = 15
-        elif percentage >= 0.9:
-            score = 12
-        elif percentage >= 0.8:
-            score = 9
-        else:
-            score = 0
+        score = _score_from_ladder(percentage, PARAMETER_SCORES)
         
         return {
             'score': score,
@@ -166,16 +255,10 @@ class QualityValidator:
             'message': f"{complete_params}/{total_nodes} nodes have complete parameters"
         }
     
-    def _check_error_handling(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
+    def _check_error_handling(self, summary: _NodeSummary) -> Dict[str, Any]:
         """Check error handling coverage (20 points)."""
-        nodes = workflow.get('nodes', [])
-        
-        # Exclude triggers and sticky notes
-        processable_nodes = [
-            n for n in nodes 
-            if not n.get('type', '').endswith('Trigger') 
-            and n.get('type') != 'n8n-nodes-base.stickyNote'
-        ]
+        # Triggers and sticky notes are excluded
+        processable_nodes = summary.processable_nodes
         
         if not processable_nodes:
             return {
@@ -185,64 +268,35 @@ class QualityValidator:
                 'message': 'No processable nodes found'
             }
         
-        nodes_with_errors = 0
-        for node in processable_nodes:
-            if 'onError' in node or 'retryOnFail' in node or 'continueOnFail' in node:
-                nodes_with_errors += 1
-        
-        percentage = nodes_with_errors / len(processable_nodes)
-        
-        if percentage >= 0.5:
-            score = 20
-        elif percentage >= 0.4:
-            score = 16
-        elif percentage >= 0.3:
-            score = 12
-        elif percentage >= 0.2:
-            score = 8
-        else:
-            score = 0
+        nodes_with_errors = summary.processable_nodes_with_error_handling
+        percentage = nodes_with_errors / processable_nodes
+        
+        score = _score_from_ladder(percentage, ERROR_HANDLING_SCORES)
         
         return {
             'score': score,
             'max_score': 20,
             'nodes_with_error_handling': nodes_with_errors,
-            'total_nodes': len(processable_nodes),
+            'total_nodes': processable_nodes,
             'percentage': percentage,
             'passed': percentage >= self.min_error_handling_percentage,
-            'message': f"{nodes_with_errors}/{len(processable_nodes)} nodes have error handling ({percentage:.0%})"
+            'message': f"{nodes_with_errors}/{processable_nodes} nodes have error handling ({percentage:.0%})"
         }
     
-    def _check_connections(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
+    def _check_connections(self, workflow: Dict[str, Any], summary: _NodeSummary) -> Dict[str, Any]:
         """Check if all nodes are properly connected (5 points)."""
-        nodes = workflow.get('nodes', [])
         connections = workflow.get('connections', {})
         
-        # Get all node names
-        node_names = {n['name'] for n in nodes}
-        
-        # Find trigger nodes (should not have incoming connections)
-        trigger_nodes = {
-            n['name'] for n in nodes 
-            if n.get('type', '').endswith('Trigger')
-        }
-        
-        # Find sticky notes (don't need connections)
-        sticky_notes = {
-            n['name'] for n in nodes
-            if n.get('type') == 'n8n-nodes-base.stickyNote'
-        }
-        
-        # Nodes that should have incoming connections
-        nodes_needing_input = node_names - trigger_nodes - sticky_notes
+        # Triggers have no incoming connections and sticky notes don't need any
+        nodes_needing_input = summary.node_names - summary.trigger_names - summary.sticky_names
         
         # Find nodes with incoming connections
-        nodes_with_input = set()
-        for source_node, conn_data in connections.items():
-            for conn_type, conn_lists in conn_data.items():
-                for conn_list in conn_lists:
-                    for conn in conn_list:
-                        nodes_with_input.add(conn['node'])
+        nodes_with_input = {
+            conn['node']
+            for conn_data in connections.values()
+            for conn_lists in conn_data.values()
+            for conn in chain.from_iterable(conn_lists)
+        }
         
         # Check if all required nodes have connections
         unconnected = nodes_needing_input - nodes_with_input
@@ -262,25 +316,10 @@ class QualityValidator:
             'message': f"{len(nodes_with_input)}/{len(nodes_needing_input)} required nodes connected"
         }
     
-    def _check_documentation(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
+    def _check_documentation(self, count: int) -> Dict[str, Any]:
         """Check documentation via sticky notes (10 points)."""
-        nodes = workflow.get('nodes', [])
-        
-        sticky_notes = [
-            n for n in nodes 
-            if n.get('type') == 'n8n-nodes-base.stickyNote'
-        ]
         
-        count = len(sticky_notes)
-        
-        if count >= 8:
-            score = 10
-        elif count >= 5:
-            score = 7
-        elif count >= 3:
-            score = 4
-        else:
-            score = 0
+        score = _score_from_ladder(count, DOCUMENTATION_SCORES)
         
         return {
             'score': score,
@@ -291,15 +330,15 @@ class QualityValidator:
             'message': f"{count} sticky notes (minimum: {self.min_sticky_notes})"
         }
     
-    def _check_flow_complexity(self, workflow: Dict[str, Any], complexity: str) -> Dict[str, Any]:
+    def _check_flow_complexity(self, type_counts: Counter, complexity: str) -> Dict[str, Any]:
         """Check flow orchestration complexity (15 points)."""
-        nodes = workflow.get('nodes', [])
+        present = type_counts.keys()
         
-        has_if_nodes = any(n['type'] == 'n8n-nodes-base.if' for n in nodes)
-        has_switch_nodes = any(n['type'] == 'n8n-nodes-base.switch' for n in nodes)
-        has_merge_nodes = any(n['type'] == 'n8n-nodes-base.merge' for n in nodes)
-        has_set_nodes = any(n['type'] == 'n8n-nodes-base.set' for n in nodes)
-        has_code_nodes = any(n.get('type') in ['n8n-nodes-base.code', 'n8n-nodes-base.function'] for n in nodes)
+        has_if_nodes = 'n8n-nodes-base.if' in present
+        has_switch_nodes = 'n8n-nodes-base.switch' in present
+        has_merge_nodes = 'n8n-nodes-base.merge' in present
+        has_set_nodes = 'n8n-nodes-base.set' in present
+        has_code_nodes = not present.isdisjoint(('n8n-nodes-base.code', 'n8n-nodes-base.function'))
         
         features = []
         if has_if_nodes or has_switch_nodes:
@@ -313,24 +352,8 @@ class QualityValidator:
         
         feature_count = len(features)
         
-        # For simple workflows, less complexity is OK
-        if complexity == 'simple':
-            if feature_count >= 2:
-                score = 15
-            elif feature_count >= 1:
-                score = 10
-            else:
-                score = 5
-        # For standard/complex workflows, require more
-        else:
-            if feature_count >= 3:
-                score = 15
-            elif feature_count >= 2:
-                score = 10
-            elif feature_count >= 1:
-                score = 5
-            else:
-                score = 0
+        ladder = FLOW_FEATURE_SCORES['simple' if complexity == 'simple' else 'default']
+        score = _score_from_ladder(feature_count, ladder)
         
         return {
             'score': score,
@@ -348,66 +371,61 @@ class QualityValidator:
     
     def _get_grade(self, score: int) -> str:
         """Get letter grade for score."""
-        if score >= 90:
-            return 'A (Excellent)'
-        elif score >= 80:
-            return 'B (Good)'
-        elif score >= 70:
-            return 'C (Acceptable)'
-        elif score >= 60:
-            return 'D (Needs Improvement)'
-        else:
-            return 'F (Poor)'
+        return _score_from_ladder(score, GRADES, default='F (Poor)')
     
     def generate_feedback(self, validation_result: Dict[str, Any]) -> List[str]:
         """Generate actionable feedback for improvement."""
         feedback = []
         details = validation_result['details']
         
+        def failed(check: str) -> bool:
+            # Short-circuited results only carry the cheap checks
+            return check in details and not details[check]['passed']
+        
         # Node count feedback
-        if not details['node_count']['passed']:
+        if failed('node_count'):
             feedback.append(
                 f"CRITICAL: Workflow has only {details['node_count']['node_count']} nodes. "
                 f"Add more nodes to reach {details['node_count']['required']} nodes minimum."
             )
         
         # Credentials feedback
-        if not details['credentials']['passed']:
+        if failed('credentials'):
             feedback.append(
                 f"CRITICAL: {details['credentials']['service_nodes'] - details['credentials']['with_credentials']} "
                 f"service nodes missing credentials configuration."
             )
         
         # Parameters feedback
-        if not details['parameters']['passed']:
+        if failed('parameters'):
             feedback.append(
                 f"CRITICAL: {details['parameters']['total_nodes'] - details['parameters']['complete_nodes']} "
                 f"nodes have incomplete or missing parameters."
             )
         
         # Error handling feedback
-        if not details['error_handling']['passed']:
+        if failed('error_handling'):
             feedback.append(
                 f"WARNING: Only {details['error_handling']['percentage']:.0%} of nodes have error handling. "
                 f"Add onError, retryOnFail, or continueOnFail to critical nodes."
             )
         
         # Connections feedback
-        if not details['connections']['passed']:
+        if failed('connections'):
             unconnected = details['connections']['unconnected_nodes']
             feedback.append(
                 f"CRITICAL: {len(unconnected)} nodes are not connected: {', '.join(unconnected[:3])}"
             )
         
         # Documentation feedback
-        if not details['documentation']['passed']:
+        if failed('documentation'):
             needed = details['documentation']['required'] - details['documentation']['sticky_note_count']
             feedback.append(
                 f"WARNING: Add {needed} more sticky notes to document workflow sections."
             )
         
         # Flow complexity feedback
-        if not details['flow_complexity']['passed']:
+        if failed('flow_complexity'):
             feedback.append(
                 f"WARNING: Workflow lacks complexity features. Add IF/Switch nodes for branching, "
                 f"Merge nodes for parallel paths, or Set nodes for data transformation."
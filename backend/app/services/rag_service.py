@@ -4,10 +4,10 @@ Retrieves relevant documentation and examples from ChromaDB.
 """
 
 import os
-from typing import List, Dict, Any
-import chromadb
-from chromadb.config import Settings
-from openai import OpenAI
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+from .openai_client import get_openai_client
 from ..config import get_settings
 
 class RAGService:
@@ -15,51 +15,121 @@ class RAGService:
     
     def __init__(self):
         self.settings = get_settings()
-        self.openai_client = OpenAI(api_key=self.settings.openai_api_key)
+        self.openai_client = get_openai_client()
         self._chroma_client = None
         self._collection = None
+        
+        # LRU caches keyed on the normalized query text
+        self._embed_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._context_cache: "OrderedDict[Tuple[str, int], List[Dict[str, Any]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
     
     @property
     def chroma_client(self):
         if self._chroma_client is None:
-            self._chroma_client = chromadb.Client(Settings(
-                persist_directory=self.settings.chroma_persist_directory,
-                anonymized_telemetry=False
-            ))
+            # Imported lazily: chromadb is heavy and not every request path needs it
+            import chromadb
+            from chromadb.config import Settings
+            
+            # PersistentClient reads the on-disk index; Client(Settings(persist_directory=...))
+            # is in-memory on chromadb 0.4 and ignores the directory
+            self._chroma_client = chromadb.PersistentClient(
+                path=self.settings.chroma_persist_directory,
+                settings=Settings(anonymized_telemetry=False)
+            )
         return self._chroma_client
     
     @property
     def collection(self):
         if self._collection is None:
             try:
-                self._collection = self.chroma_client.get_collection(
-                    name=self.settings.chroma_collection_name
+                # One call, no exception-driven fallback when the collection is missing
+                self._collection = self.chroma_client.get_or_create_collection(
+                    name=self.settings.chroma_collection_name,
+                    metadata={"description": "n8n workflow documentation and examples"}
                 )
             except Exception as e:
-                # Collection doesn't exist, create it
-                try:
-                    self._collection = self.chroma_client.create_collection(
-                        name=self.settings.chroma_collection_name,
-                        metadata={"description": "n8n workflow documentation and examples"}
-                    )
-                except Exception as create_error:
-                    print(f"Warning: Could not create ChromaDB collection: {create_error}")
-                    # Return None to indicate collection is not available
-                    return None
+                print(f"Warning: Could not create ChromaDB collection: {e}")
+                # Return None to indicate collection is not available
+                return None
         return self._collection
     
+    def warmup(self) -> None:
+        """Open the collection and load its vector index so the first request does not pay for it."""
+        collection = self.collection
+        if collection is None:
+            return
+        
+        try:
+            # Query with a stored embedding: no OpenAI call, same index load as a real query
+            sample = collection.peek(limit=1)
+            embeddings = sample.get('embeddings')
+            if embeddings is not None and len(embeddings) > 0:
+                collection.query(query_embeddings=[embeddings[0]], n_results=1)
+        except Exception as e:
+            print(f"Warning: Could not warm up ChromaDB collection: {e}")
+    
+    @staticmethod
+    def _normalize_query(text: str) -> str:
+        """Normalize a query so trivially different phrasings share cache entries."""
+        return " ".join(text.lower().split())
+    
+    def _cache_get(self, cache: OrderedDict, key: Any) -> Any:
+        with self._cache_lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+    
+    def _cache_put(self, cache: OrderedDict, key: Any, value: Any) -> None:
+        with self._cache_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self.settings.rag_cache_size:
+                cache.popitem(last=False)
+    
+    def invalidate_cache(self) -> None:
+        """Drop cached embeddings and retrieval results (call after re-ingesting the collection)."""
+        with self._cache_lock:
+            self._embed_cache.clear()
+            self._context_cache.clear()
+    
     def create_embedding(self, text: str) -> List[float]:
         """Create embedding for query text."""
-        response = self.openai_client.embeddings.create(
-            model=self.settings.embedding_model,
-            input=text
-        )
-        return response.data[0].embedding
+        key = self._normalize_query(text)
+        embedding = self._cache_get(self._embed_cache, key)
+        if embedding is None:
+            response = self.openai_client.embeddings.create(
+                model=self.settings.embedding_model,
+                input=text
+            )
+            embedding = response.data[0].embedding
+            self._cache_put(self._embed_cache, key, embedding)
+        return embedding
+    
+    def create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Create embeddings for several texts, sending only cache misses in a single API request."""
+        keys = [self._normalize_query(text) for text in texts]
+        embeddings = [self._cache_get(self._embed_cache, key) for key in keys]
+        
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            response = self.openai_client.embeddings.create(
+                model=self.settings.embedding_model,
+                input=[texts[i] for i in missing]
+            )
+            for item in response.data:
+                i = missing[item.index]
+                embeddings[i] = item.embedding
+                self._cache_put(self._embed_cache, keys[i], item.embedding)
+        
+        return embeddings
     
     def retrieve_relevant_context(
         self,
         query: str,
-        top_k: int = None
+        top_k: int = None,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Retrieve relevant documentation chunks based on query.
@@ -67,6 +137,7 @@ class RAGService:
         Args:
             query: User's request or question
             top_k: Number of results to return (default from settings)
+            query_embedding: Precomputed embedding of query (embedded here if None)
         
         Returns:
             List of relevant documents with metadata
@@ -79,9 +150,15 @@ class RAGService:
         if top_k is None:
             top_k = self.settings.top_k_retrieval
         
+        cache_key = (self._normalize_query(query), top_k)
+        cached = self._cache_get(self._context_cache, cache_key)
+        if cached is not None:
+            return list(cached)
+        
         try:
-            # Create query embedding
-            query_embedding = self.create_embedding(query)
+            # Create query embedding unless the caller already has one
+            if query_embedding is None:
+                query_embedding = self.create_embedding(query)
             
             # Query ChromaDB
             results = self.collection.query(
@@ -89,21 +166,67 @@ class RAGService:
                 n_results=top_k
             )
             
-            # Format results
-            context_items = []
-            if results['documents'] and results['documents'][0]:
-                for i, doc in enumerate(results['documents'][0]):
-                    context_items.append({
-                        'content': doc,
-                        'metadata': results['metadatas'][0][i] if results['metadatas'] else {},
-                        'distance': results['distances'][0][i] if results['distances'] else None
-                    })
-            
-            return context_items
+            context_items = self._context_items_from_results(results, 0)
+            self._cache_put(self._context_cache, cache_key, context_items)
+            return list(context_items)
         except Exception as e:
             print(f"Warning: Error retrieving context: {e}")
             return []
     
+    def retrieve_relevant_context_batch(
+        self,
+        queries: List[str],
+        top_k: int = None,
+        query_embeddings: Optional[List[List[float]]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve context for several queries with one embedding call and one ChromaDB query.
+        
+        Args:
+            queries: Queries to retrieve context for
+            top_k: Number of results per query (default from settings)
+            query_embeddings: Precomputed embeddings aligned with queries (optional)
+        
+        Returns:
+            One list of relevant documents per query
+        """
+        if not queries:
+            return []
+        
+        if self.collection is None:
+            print("Warning: ChromaDB collection not available, skipping RAG retrieval")
+            return [[] for _ in queries]
+        
+        if top_k is None:
+            top_k = self.settings.top_k_retrieval
+        
+        try:
+            if query_embeddings is None:
+                query_embeddings = self.create_embeddings(queries)
+            
+            results = self.collection.query(
+                query_embeddings=query_embeddings,
+                n_results=top_k
+            )
+            
+            return [self._context_items_from_results(results, row) for row in range(len(queries))]
+        except Exception as e:
+            print(f"Warning: Error retrieving context: {e}")
+            return [[] for _ in queries]
+    
+    @staticmethod
+    def _context_items_from_results(results: Dict[str, Any], row: int) -> List[Dict[str, Any]]:
+        """Format one query's rows of a ChromaDB query result."""
+        context_items = []
+        if results['documents'] and results['documents'][row]:
+            for i, doc in enumerate(results['documents'][row]):
+                context_items.append({
+                    'content': doc,
+                    'metadata': results['metadatas'][row][i] if results['metadatas'] else {},
+                    'distance': results['distances'][row][i] if results['distances'] else None
+                })
+        return context_items
+    
     def format_context_for_llm(self, context_items: List[Dict[str, Any]]) -> str:
         """
         Format retrieved context into a string for LLM prompt.
@@ -117,27 +240,63 @@ class RAGService:
         if not context_items:
             return "No specific documentation found. Use your general n8n knowledge."
         
-        formatted = "# Relevant n8n Documentation\n\n"
+        parts = ["# Relevant n8n Documentation\n\n"]
         
         for i, item in enumerate(context_items, 1):
             metadata = item.get('metadata', {})
             title = metadata.get('title', f'Document {i}')
             content = item.get('content', '')
             
-            formatted += f"## {title}\n\n{content}\n\n---\n\n"
+            parts.append(f"## {title}\n\n{content}\n\n---\n\n")
         
-        return formatted
+        return "".join(parts)
     
-    def get_context_for_generation(self, user_request: str) -> str:
+    def get_context_for_generation(
+        self,
+        user_request: str,
+        query_embedding: Optional[List[float]] = None,
+        sub_queries: Optional[List[str]] = None
+    ) -> str:
         """
         Main method to get formatted context for workflow generation.
         
         Args:
             user_request: User's workflow request
+            query_embedding: Precomputed embedding of user_request (optional)
+            sub_queries: Extra queries (e.g. per workflow section) retrieved in the same batch
         
         Returns:
             Formatted context string ready for LLM prompt
         """
-        context_items = self.retrieve_relevant_context(user_request)
+        if not sub_queries:
+            context_items = self.retrieve_relevant_context(
+                user_request,
+                query_embedding=query_embedding
+            )
+            return self.format_context_for_llm(context_items)
+        
+        # Embed only what we don't already have, then query everything at once
+        try:
+            if query_embedding is None:
+                embeddings = self.create_embeddings([user_request, *sub_queries])
+            else:
+                embeddings = [query_embedding, *self.create_embeddings(sub_queries)]
+        except Exception as e:
+            print(f"Warning: Error retrieving context: {e}")
+            return self.format_context_for_llm([])
+        
+        batches = self.retrieve_relevant_context_batch(
+            [user_request, *sub_queries],
+            query_embeddings=embeddings
+        )
+        
+        # Merge in query order, dropping documents already retrieved by an earlier query
+        seen = set()
+        context_items = []
+        for items in batches:
+            for item in items:
+                if item['content'] not in seen:
+                    seen.add(item['content'])
+                    context_items.append(item)
         return self.format_context_for_llm(context_items)
 
@@ -6,24 +6,48 @@ Now uses multi-stage pipeline for production-ready workflows.
 
 import sys
 import os
+import json
+import importlib.util
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, Tuple
 
-# Add rag_system scripts to path
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# rag_system scripts live outside the app package
 rag_scripts_path = Path(__file__).parent.parent.parent / "rag_system" / "scripts"
-sys.path.insert(0, str(rag_scripts_path))
+
+
+def _load_rag_script(module_name: str):
+    """Load a rag_system script by file path instead of putting its directory on sys.path."""
+    spec = importlib.util.spec_from_file_location(module_name, rag_scripts_path / f"{module_name}.py")
+    module = importlib.util.module_from_spec(spec)
+    # Registered first, as for a normal import (the scripts import each other by name)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
+
 
 # Try to import enhanced RAG retriever
 try:
-    from enhanced_rag_retriever import EnhancedRAGRetriever
+    EnhancedRAGRetriever = _load_rag_script("enhanced_rag_retriever").EnhancedRAGRetriever
     RAG_AVAILABLE = True
     print("✓ Enhanced RAG retriever available")
-except ImportError:
+except (ImportError, FileNotFoundError):
     try:
-        from rag_retriever import N8NWorkflowRAG as EnhancedRAGRetriever
+        EnhancedRAGRetriever = _load_rag_script("rag_retriever").N8NWorkflowRAG
         RAG_AVAILABLE = True
         print("⚠ Using basic RAG retriever")
-    except ImportError:
+    except (ImportError, FileNotFoundError):
         RAG_AVAILABLE = False
         print("Warning: RAG system not available. Using fallback generator.")
 
@@ -39,6 +63,31 @@ except ImportError:
     ENHANCED_GENERATOR_AVAILABLE = False
     print("⚠ Enhanced generator not available, using basic version")
 
+# Retrieval results are reused for identical queries within this window
+RETRIEVAL_CACHE_SIZE = 256
+RETRIEVAL_CACHE_TTL_SECONDS = 600.0
+
+# WorkflowGenerator.calculate_complexity score (1-10) -> enhanced generator complexity
+COMPLEXITY_MAP = {
+    1: 'simple',
+    2: 'simple',
+    3: 'simple',
+    4: 'simple',
+    5: 'standard',
+    6: 'standard',
+    7: 'standard',
+    8: 'complex',
+    9: 'complex',
+    10: 'complex'
+}
+
+
+def _clone_workflow(workflow: Dict[str, Any]) -> Dict[str, Any]:
+    """Deep-copy a JSON workflow (a serialize/parse round trip beats copy.deepcopy here)."""
+    if orjson is not None:
+        return orjson.loads(orjson.dumps(workflow))
+    return json.loads(json.dumps(workflow))
+
 
 class RAGEnhancedWorkflowGenerator:
     """
@@ -51,6 +100,10 @@ class RAGEnhancedWorkflowGenerator:
         self.rag = None
         self.enhanced_generator = None
         
+        # key -> (retrieved_at, result); results are shared, callers must not mutate them
+        self._retrieval_cache: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._retrieval_lock = threading.Lock()
+        
         # Initialize enhanced generator if available
         if ENHANCED_GENERATOR_AVAILABLE:
             try:
@@ -122,20 +175,8 @@ class RAGEnhancedWorkflowGenerator:
         integrations = requirements.get('integrations', [])
         
         # Determine complexity
-        complexity_map = {
-            1: 'simple',
-            2: 'simple',
-            3: 'simple',
-            4: 'simple',
-            5: 'standard',
-            6: 'standard',
-            7: 'standard',
-            8: 'complex',
-            9: 'complex',
-            10: 'complex'
-        }
         complexity_score = self.fallback_generator.calculate_complexity(requirements)
-        complexity = complexity_map.get(complexity_score, 'standard')
+        complexity = COMPLEXITY_MAP.get(complexity_score, 'standard')
         
         print(f"\nQuery: {query}")
         print(f"Complexity: {complexity} (score: {complexity_score})")
@@ -143,11 +184,14 @@ class RAGEnhancedWorkflowGenerator:
         
         # Retrieve RAG context
         if hasattr(self.rag, 'retrieve_context'):
-            context = self.rag.retrieve_context(
-                query=query,
-                use_case=use_case,
-                integrations=integrations,
-                complexity=complexity
+            context = self._cached_retrieval(
+                ('context', query, use_case, tuple(integrations), complexity),
+                lambda: self.rag.retrieve_context(
+                    query=query,
+                    use_case=use_case,
+                    integrations=integrations,
+                    complexity=complexity
+                )
             )
         else:
             # Fallback for basic RAG
@@ -181,6 +225,24 @@ class RAGEnhancedWorkflowGenerator:
         
         return result
     
+    def _cached_retrieval(self, key: Tuple, retrieve: Callable[[], Any]) -> Any:
+        """Return a cached retrieval result for key, or run retrieve() and cache it (LRU + TTL)."""
+        now = time.monotonic()
+        with self._retrieval_lock:
+            entry = self._retrieval_cache.get(key)
+            if entry is not None and now - entry[0] < RETRIEVAL_CACHE_TTL_SECONDS:
+                self._retrieval_cache.move_to_end(key)
+                return entry[1]
+        
+        result = retrieve()
+        
+        with self._retrieval_lock:
+            self._retrieval_cache[key] = (now, result)
+            self._retrieval_cache.move_to_end(key)
+            while len(self._retrieval_cache) > RETRIEVAL_CACHE_SIZE:
+                self._retrieval_cache.popitem(last=False)
+        return result
+    
     def _check_rag_ready(self) -> bool:
         """Check if RAG system is ready with embeddings."""
         if not self.rag or not self.rag.collection:
@@ -212,16 +274,22 @@ class RAGEnhancedWorkflowGenerator:
         
         # Retrieve similar workflows
         if analysis['required_features']:
-            similar_workflows = self.rag.retrieve_by_features(
-                query,
-                required_features=analysis['required_features'],
-                n_results=3
+            similar_workflows = self._cached_retrieval(
+                ('features', query, tuple(analysis['required_features'])),
+                lambda: self.rag.retrieve_by_features(
+                    query,
+                    required_features=analysis['required_features'],
+                    n_results=3
+                )
             )
         else:
-            similar_workflows = self.rag.retrieve_by_complexity(
-                query,
-                complexity=complexity,
-                n_results=3
+            similar_workflows = self._cached_retrieval(
+                ('complexity', query, complexity),
+                lambda: self.rag.retrieve_by_complexity(
+                    query,
+                    complexity=complexity,
+                    n_results=3
+                )
             )
         
         print(f"Retrieved {len(similar_workflows)} similar workflows")
@@ -305,9 +373,8 @@ class RAGEnhancedWorkflowGenerator:
         import uuid
         from datetime import datetime
         
-        # Create a deep copy of the template
-        import json
-        enhanced = json.loads(json.dumps(template))
+        # Create a deep copy of the template (it may be shared via the retrieval cache)
+        enhanced = _clone_workflow(template)
         
         # Update workflow name
         if conversation and conversation.initial_request:
@@ -318,9 +385,17 @@ class RAGEnhancedWorkflowGenerator:
             action = requirements.get("outputs", ["Processing"])[0]
             enhanced['name'] = f"{trigger.title()} to {action.title()} - Enhanced"
         
-        # Regenerate node IDs and webhookIds to make them unique
+        trigger_type = requirements.get("trigger")
+        db_type = requirements.get("database")
+        outputs = requirements.get("outputs", [])
+        
+        # Single pass over the nodes: regenerate IDs and annotate nodes against the requirements
         node_id_map = {}
         for node in enhanced.get('nodes', []):
+            node_type = node.get('type') or ''
+            node_type_lower = node_type.lower()
+            
+            # Regenerate node IDs and webhookIds to make them unique
             old_id = node.get('id')
             new_id = str(uuid.uuid4())
             node['id'] = new_id
@@ -328,54 +403,39 @@ class RAGEnhancedWorkflowGenerator:
             if old_id:
                 node_id_map[old_id] = new_id
             
-            # Regenerate webhook IDs
-            if node.get('type') == 'n8n-nodes-base.webhook':
+            if node_type == 'n8n-nodes-base.webhook':
                 node['webhookId'] = str(uuid.uuid4())
                 
                 # Update webhook path with user requirements
                 if requirements.get("webhook_path"):
                     node.setdefault('parameters', {})['path'] = requirements['webhook_path']
-        
-        # Update trigger node parameters if needed
-        trigger_type = requirements.get("trigger")
-        if trigger_type:
-            for node in enhanced.get('nodes', []):
-                node_type = node.get('type', '')
-                
-                # If user wants webhook but template has different trigger, note it
-                if trigger_type == "webhook" and "webhook" not in node_type.lower():
-                    if "trigger" in node_type.lower():
-                        # Add note about trigger difference
-                        node['notes'] = f"Original template used {node_type}. Consider changing to webhook trigger."
-        
-        # Update database configurations if specified
-        if requirements.get("database"):
-            db_type = requirements['database']
-            for node in enhanced.get('nodes', []):
-                if 'postgres' in node.get('type', '').lower() or 'mysql' in node.get('type', '').lower():
-                    # Update to user's preferred database
-                    if db_type != "postgres" and db_type != "mysql":
-                        node['notes'] = f"Consider changing to {db_type} if needed"
-        
-        # Update output nodes based on requirements
-        outputs = requirements.get("outputs", [])
-        if outputs:
-            for node in enhanced.get('nodes', []):
-                node_type = node.get('type', '').lower()
-                
+            
+            # If user wants webhook but template has different trigger, note it
+            if trigger_type == "webhook" and "webhook" not in node_type_lower:
+                if "trigger" in node_type_lower:
+                    node['notes'] = f"Original template used {node_type}. Consider changing to webhook trigger."
+            
+            # Update database configurations if specified
+            if db_type and ('postgres' in node_type_lower or 'mysql' in node_type_lower):
+                # Update to user's preferred database
+                if db_type != "postgres" and db_type != "mysql":
+                    node['notes'] = f"Consider changing to {db_type} if needed"
+            
+            # Update output nodes based on requirements
+            if outputs:
                 # Update email nodes
-                if 'gmail' in node_type or 'email' in node_type:
+                if 'gmail' in node_type_lower or 'email' in node_type_lower:
                     if "email" in outputs and 'parameters' in node:
                         # Keep the structure but mark for configuration
                         node['notes'] = "Email output - configure credentials and recipient"
                 
                 # Update Slack nodes
-                if 'slack' in node_type:
+                if 'slack' in node_type_lower:
                     if "slack" in outputs:
                         node['notes'] = "Slack output - configure credentials and channel"
                 
                 # Update database nodes
-                if any(db in node_type for db in ['postgres', 'mysql', 'mongodb']):
+                if any(db in node_type_lower for db in ['postgres', 'mysql', 'mongodb']):
                     if "database" in outputs:
                         node['notes'] = "Database output - configure credentials and table"
         
@@ -408,12 +468,16 @@ class RAGEnhancedWorkflowGenerator:
 
 # Global instance
 _rag_generator_instance = None
+_rag_generator_lock = threading.Lock()
 
 
 def get_rag_workflow_generator() -> RAGEnhancedWorkflowGenerator:
     """Get singleton instance of RAG-enhanced workflow generator."""
     global _rag_generator_instance
     if _rag_generator_instance is None:
-        _rag_generator_instance = RAGEnhancedWorkflowGenerator()
+        # Double-checked so concurrent first requests build the (heavy) retriever only once
+        with _rag_generator_lock:
+            if _rag_generator_instance is None:
+                _rag_generator_instance = RAGEnhancedWorkflowGenerator()
     return _rag_generator_instance
 
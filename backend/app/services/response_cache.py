@@ -0,0 +1,155 @@
+"""
+Response cache for LLM workflow generation.
+Two-tier lookup: exact match on the normalized request, then embedding similarity.
+"""
+
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Callable, Tuple
+
+import numpy as np
+
+from ..config import get_settings
+
+
+class ResponseCache:
+    """LRU + TTL cache of generated workflows keyed on the user request."""
+    
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 3600.0,
+        similarity_threshold: float = 0.95
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        
+        # key -> (created_at, response, embedding or None)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def normalize(user_request: str) -> str:
+        """Normalize a request so trivially different phrasings share a key."""
+        return " ".join(user_request.lower().split())
+    
+    @classmethod
+    def make_key(cls, user_request: str) -> str:
+        """Hash the normalized request into a cache key."""
+        normalized = cls.normalize(user_request).encode("utf-8")
+        return hashlib.blake2b(normalized, digest_size=16).hexdigest()
+    
+    def lookup(
+        self,
+        user_request: str,
+        embed: Optional[Callable[[str], List[float]]] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[np.ndarray]]:
+        """
+        Look up a cached response.
+        
+        Args:
+            user_request: User's workflow request
+            embed: Optional embedding function for the semantic tier
+        
+        Returns:
+            (copy of the cached response or None, query embedding or None).
+            The embedding is returned so a later put() does not embed again.
+        """
+        key = self.make_key(user_request)
+        
+        with self._lock:
+            self._evict_expired()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return copy.deepcopy(entry[1]), entry[2]
+        
+        if embed is None:
+            return None, None
+        
+        # Semantic tier: one matrix-vector product against all stored embeddings
+        query = self._embed_normalized(embed, user_request)
+        if query is None:
+            return None, None
+        
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if e[2] is not None]
+            if not keys:
+                return None, query
+            
+            matrix = np.stack([self._entries[k][2] for k in keys])
+            scores = matrix @ query
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                return None, query
+            
+            self._entries.move_to_end(keys[best])
+            return copy.deepcopy(self._entries[keys[best]][1]), query
+    
+    def put(
+        self,
+        user_request: str,
+        response: Dict[str, Any],
+        embedding: Optional[np.ndarray] = None
+    ) -> None:
+        """Store a response; pass the embedding from lookup() to enable semantic hits."""
+        key = self.make_key(user_request)
+        if embedding is not None:
+            # Stored as float32 so lookup() stacks arrays without converting each entry
+            embedding = np.asarray(embedding, dtype=np.float32)
+        
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(response), embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        with self._lock:
+            self._entries.clear()
+    
+    def _evict_expired(self) -> None:
+        """Remove entries older than the TTL (oldest entries are at the front)."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [k for k, e in self._entries.items() if e[0] < cutoff]
+        for k in expired:
+            del self._entries[k]
+    
+    @staticmethod
+    def _embed_normalized(
+        embed: Callable[[str], List[float]],
+        user_request: str
+    ) -> Optional[np.ndarray]:
+        """Embed a request and L2-normalize it so dot products are cosine similarity."""
+        try:
+            vector = np.asarray(embed(user_request), dtype=np.float32)
+        except Exception as e:
+            print(f"Warning: Could not embed request for response cache: {e}")
+            return None
+        
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
+
+
+# Global instance
+_response_cache = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get singleton instance of the response cache."""
+    global _response_cache
+    if _response_cache is None:
+        settings = get_settings()
+        _response_cache = ResponseCache(
+            max_entries=settings.response_cache_size,
+            ttl_seconds=settings.response_cache_ttl_seconds,
+            similarity_threshold=settings.response_cache_similarity_threshold
+        )
+    return _response_cache
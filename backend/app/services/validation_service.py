@@ -3,27 +3,29 @@ Validation service for n8n workflows.
 Ensures generated workflows are valid and complete.
 """
 
-from typing import List, Set
+from typing import AbstractSet, List, Set, Tuple
 from ..models.workflow import WorkflowJSON, ValidationResult, ValidationError
 
 class ValidationService:
     """Validates n8n workflow structure and integrity."""
     
-    REQUIRED_WORKFLOW_FIELDS = ['name', 'nodes', 'connections']
-    REQUIRED_NODE_FIELDS = ['id', 'name', 'type', 'typeVersion', 'position', 'parameters']
-    TRIGGER_NODE_TYPES = [
+    REQUIRED_WORKFLOW_FIELDS = ('name', 'nodes', 'connections')
+    REQUIRED_NODE_FIELDS = ('id', 'name', 'type', 'typeVersion', 'position', 'parameters')
+    TRIGGER_NODE_TYPES = frozenset({
         'n8n-nodes-base.manualTrigger',
         'n8n-nodes-base.webhook',
         'n8n-nodes-base.scheduleTrigger',
         'n8n-nodes-base.cronTrigger'
-    ]
+    })
     
-    def validate_workflow(self, workflow: WorkflowJSON) -> ValidationResult:
+    def validate_workflow(self, workflow: WorkflowJSON, fail_fast: bool = False) -> ValidationResult:
         """
         Perform comprehensive validation of workflow.
         
         Args:
             workflow: The workflow to validate
+            fail_fast: Stop at the first error for callers that only need isValid;
+                the result then holds at most that error and no warnings
         
         Returns:
             ValidationResult with errors and warnings
@@ -31,24 +33,31 @@ class ValidationService:
         errors: List[ValidationError] = []
         warnings: List[str] = []
         
+        # Shared by the connection walk and the duplicate-name check
+        node_names = frozenset(node.name for node in workflow.nodes)
+        
+        if fail_fast:
+            return self._validate_fail_fast(workflow, node_names)
+        
         # Validate structure
         errors.extend(self._validate_structure(workflow))
         
         # Validate nodes
         errors.extend(self._validate_nodes(workflow))
         
-        # Validate connections
-        errors.extend(self._validate_connections(workflow))
+        # Validate connections (one walk also collects the connected node names)
+        connection_errors, connected_nodes = self._walk_connections(workflow, node_names)
+        errors.extend(connection_errors)
         
         # Validate trigger
         trigger_warnings = self._validate_trigger(workflow)
         warnings.extend(trigger_warnings)
         
         # Validate node names are unique
-        errors.extend(self._validate_unique_names(workflow))
+        errors.extend(self._validate_unique_names(workflow, node_names))
         
         # Additional warnings
-        warnings.extend(self._generate_warnings(workflow))
+        warnings.extend(self._generate_warnings(workflow, connected_nodes))
         
         return ValidationResult(
             isValid=len(errors) == 0,
@@ -56,14 +65,32 @@ class ValidationService:
             warnings=warnings
         )
     
+    def _validate_fail_fast(
+        self,
+        workflow: WorkflowJSON,
+        node_names: AbstractSet[str]
+    ) -> ValidationResult:
+        """Run the error checks in order, skipping the rest once one fails."""
+        checks = (
+            lambda: self._validate_structure(workflow),
+            lambda: self._validate_nodes(workflow),
+            lambda: self._walk_connections(workflow, node_names)[0],
+            lambda: self._validate_unique_names(workflow, node_names)
+        )
+        for check in checks:
+            errors = check()
+            if errors:
+                return ValidationResult(isValid=False, errors=errors[:1], warnings=[])
+        
+        return ValidationResult(isValid=True, errors=[], warnings=[])
+    
     def _validate_structure(self, workflow: WorkflowJSON) -> List[ValidationError]:
         """Validate basic workflow structure."""
         errors = []
         
-        # Check required fields
-        workflow_dict = workflow.model_dump()
+        # Check required fields (attribute access; no need to dump the whole model)
         for field in self.REQUIRED_WORKFLOW_FIELDS:
-            if field not in workflow_dict or workflow_dict[field] is None:
+            if getattr(workflow, field, None) is None:
                 errors.append(ValidationError(
                     type="structure",
                     message=f"Missing required field: {field}"
@@ -83,11 +110,9 @@ class ValidationService:
         errors = []
         
         for node in workflow.nodes:
-            node_dict = node.model_dump()
-            
             # Check required fields
             for field in self.REQUIRED_NODE_FIELDS:
-                if field not in node_dict or node_dict[field] is None:
+                if getattr(node, field, None) is None:
                     errors.append(ValidationError(
                         type="node",
                         message=f"Node missing required field: {field}",
@@ -112,36 +137,47 @@ class ValidationService:
         
         return errors
     
-    def _validate_connections(self, workflow: WorkflowJSON) -> List[ValidationError]:
-        """Validate workflow connections."""
-        errors = []
+    def _walk_connections(
+        self,
+        workflow: WorkflowJSON,
+        node_names: AbstractSet[str]
+    ) -> Tuple[List[ValidationError], Set[str]]:
+        """
+        Validate workflow connections in a single pass.
         
-        # Get all node names
-        node_names = {node.name for node in workflow.nodes}
+        Returns:
+            (connection errors, names of every node that appears in a connection)
+        """
+        errors = []
+        connected_nodes = set()
         
         # Check each connection
         for source_name, outputs in workflow.connections.items():
+            connected_nodes.add(source_name)
+            
             # Validate source node exists
-            if source_name not in node_names:
+            source_exists = source_name in node_names
+            if not source_exists:
                 errors.append(ValidationError(
                     type="connection",
                     message=f"Connection source node not found: {source_name}"
                 ))
-                continue
             
             # Check main connections
             if 'main' in outputs:
                 for output_group in outputs['main']:
                     for connection in output_group:
-                        # Validate target node exists
-                        if connection.node not in node_names:
+                        connected_nodes.add(connection.node)
+                        
+                        # Validate target node exists (only reported for known sources)
+                        if source_exists and connection.node not in node_names:
                             errors.append(ValidationError(
                                 type="connection",
                                 message=f"Connection target node not found: {connection.node}",
                                 nodeId=source_name
                             ))
         
-        return errors
+        return errors, connected_nodes
     
     def _validate_trigger(self, workflow: WorkflowJSON) -> List[str]:
         """Validate workflow has appropriate trigger."""
@@ -161,9 +197,18 @@ class ValidationService:
         
         return warnings
     
-    def _validate_unique_names(self, workflow: WorkflowJSON) -> List[ValidationError]:
+    def _validate_unique_names(
+        self,
+        workflow: WorkflowJSON,
+        node_names: AbstractSet[str]
+    ) -> List[ValidationError]:
         """Validate all node names are unique."""
         errors = []
+        
+        # As many distinct names as nodes: nothing to report
+        if len(node_names) == len(workflow.nodes):
+            return errors
+        
         seen_names: Set[str] = set()
         
         for node in workflow.nodes:
@@ -177,19 +222,11 @@ class ValidationService:
         
         return errors
     
-    def _generate_warnings(self, workflow: WorkflowJSON) -> List[str]:
+    def _generate_warnings(self, workflow: WorkflowJSON, connected_nodes: Set[str]) -> List[str]:
         """Generate helpful warnings."""
         warnings = []
         
         # Check for disconnected nodes
-        connected_nodes = set()
-        for source_name, outputs in workflow.connections.items():
-            connected_nodes.add(source_name)
-            if 'main' in outputs:
-                for output_group in outputs['main']:
-                    for connection in output_group:
-                        connected_nodes.add(connection.node)
-        
         disconnected = []
         for node in workflow.nodes:
             if node.name not in connected_nodes:
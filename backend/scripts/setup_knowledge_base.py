@@ -26,10 +26,10 @@ class KnowledgeBaseSetup:
         persist_dir = os.getenv("CHROMA_PERSIST_DIRECTORY", "./data/embeddings")
         Path(persist_dir).mkdir(parents=True, exist_ok=True)
         
-        self.chroma_client = chromadb.Client(Settings(
-            persist_directory=persist_dir,
-            anonymized_telemetry=False
-        ))
+        self.chroma_client = chromadb.PersistentClient(
+            path=persist_dir,
+            settings=Settings(anonymized_telemetry=False)
+        )
         
         # Get or create collection
         self.collection = self.chroma_client.get_or_create_collection(